@@ -0,0 +1,289 @@
+"""Mock PAN-OS XML API for benchmarking the integration.
+
+Serves generated responses for every request the integration makes:
+keygen, the poll commands, the running-config rulebase and objects, the
+rule hit counts, config edits and commits. Large responses (rulebase, hit
+counts, routing table) are generated while they are written, so the mock
+itself stays small even at 50k rules / 500k routes.
+
+    python -m benchmarks.mock_panos --rules 10000 --routes 500000 --latency 0.05
+
+Prints ``listening on <port>`` once it accepts connections. ``POST
+/bench/config-change`` simulates a commit made outside Home Assistant.
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import random
+import ssl
+import sys
+import xml.etree.ElementTree as ET
+
+from aiohttp import web
+import trustme
+
+API_KEY = "bench-key"
+CHUNK_ENTRIES = 500
+ZONES = ("trust", "untrust", "dmz", "guest")
+APPLICATIONS = ("web-browsing", "ssl", "dns", "ntp", "ssh", "any")
+ROUTE_FLAGS = ("A S", "A C", "A H", "A O", "A B", "A B", "A B")
+
+
+class MockFirewall:
+    def __init__(self, rules: int, routes: int, latency: float, seed: int = 1):
+        self.rules = rules
+        self.routes = routes
+        self.latency = latency
+        self.seed = seed
+        self.commit_job = 1
+        self.next_job = 2
+        self.requests = 0
+
+    # -- dispatch ---------------------------------------------------------
+
+    async def handle_api(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        params = dict(request.query)
+        if request.method == "POST":
+            params.update(await request.post())
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        req_type = params.get("type")
+        if req_type == "keygen":
+            return _xml(f"<result><key>{API_KEY}</key></result>")
+        if request.headers.get("X-PAN-KEY", params.get("key")) != API_KEY:
+            return _xml("<msg>Invalid credentials.</msg>", status="error", code="403")
+
+        if req_type == "op":
+            return await self._op(request, params["cmd"])
+        if req_type == "config":
+            return await self._config(request, params)
+        if req_type == "commit":
+            return self._commit()
+        return _xml("<msg>Unsupported request</msg>", status="error")
+
+    async def handle_config_change(self, request: web.Request) -> web.Response:
+        self._commit()
+        return web.Response(text=str(self.commit_job))
+
+    async def _op(self, request, cmd: str) -> web.StreamResponse:
+        root = ET.fromstring(cmd)
+        path = [root.tag]
+        node = root
+        while len(node) and node[0].tag != "entry":
+            node = node[0]
+            path.append(node.tag)
+        path = tuple(path)
+
+        if path == ("show", "system", "info"):
+            return _xml(SYSTEM_INFO)
+        if path == ("check", "pending-changes"):
+            return _xml("<result>no</result>")
+        if path == ("show", "session", "info"):
+            return _xml(
+                f"<result><num-active>{random.randint(1000, 50000)}</num-active>"
+                f"<cps>{random.randint(10, 2000)}</cps><kbps>{random.randint(1000, 900000)}</kbps></result>"
+            )
+        if path == ("show", "system", "resources"):
+            return _xml(f"<result><![CDATA[{_top_output()}]]></result>")
+        if path == ("show", "running", "resource-monitor", "second"):
+            return _xml(_resource_monitor())
+        if path == ("show", "jobs", "all"):
+            return _xml(
+                f"<result><job><id>{self.commit_job}</id><type>Commit</type>"
+                "<status>FIN</status><result>OK</result></job></result>"
+            )
+        if path[:2] == ("show", "jobs"):
+            job_id = root.findtext("./jobs/id")
+            return _xml(f"<result><job><id>{job_id}</id><status>FIN</status><result>OK</result></job></result>")
+        if path == ("show", "routing", "route"):
+            return await self._stream(request, "<result>", self._route_entries(), "</result>")
+        if path[:2] == ("show", "rule-hit-count"):
+            return await self._stream(
+                request,
+                "<result><rule-hit-count><vsys><entry name='vsys1'><rule-base>"
+                "<entry name='security'><rules>",
+                self._hit_entries(),
+                "</rules></entry></rule-base></entry></vsys></rule-hit-count></result>",
+            )
+        return _xml(f"<msg>Unknown command {cmd}</msg>", status="error")
+
+    async def _config(self, request, params: dict) -> web.StreamResponse:
+        action = params.get("action")
+        if action in ("set", "edit", "delete", "multi-config"):
+            return _xml("<msg>command succeeded</msg>")
+        xpath = params.get("xpath", "")
+        if xpath.endswith("/vsys/entry"):
+            return _xml("<result count='1'><entry name='vsys1'><rulebase/></entry></result>")
+        if xpath.endswith("/rulebase"):
+            return await self._stream(
+                request,
+                "<result><rulebase><security><rules>",
+                self._rule_entries(),
+                "</rules></security><nat><rules/></nat><decryption><rules/></decryption></rulebase></result>",
+            )
+        if "|" in xpath:
+            return _xml(self._objects())
+        return _xml("<result/>")
+
+    def _commit(self) -> web.Response:
+        self.commit_job = self.next_job
+        self.next_job += 1
+        return _xml(f"<result><msg><line>Commit job enqueued</line></msg><job>{self.commit_job}</job></result>")
+
+    async def _stream(self, request, head: str, entries, tail: str) -> web.StreamResponse:
+        resp = web.StreamResponse(headers={"Content-Type": "application/xml"})
+        await resp.prepare(request)
+        await resp.write(f'<response status="success">{head}'.encode())
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) == CHUNK_ENTRIES:
+                await resp.write("".join(batch).encode())
+                batch.clear()
+        await resp.write(("".join(batch) + f"{tail}</response>").encode())
+        await resp.write_eof()
+        return resp
+
+    # -- generated content ------------------------------------------------
+
+    def _rule_entries(self):
+        rng = random.Random(self.seed)
+        for i in range(self.rules):
+            src = f"<member>addr-{i % 200}</member>" if i % 3 else "<member>any</member>"
+            dst = f"<member>grp-{i % 20}</member>" if i % 4 else "<member>10.{i % 250}.0.0/16</member>"
+            disabled = "<disabled>yes</disabled>" if i % 17 == 0 else ""
+            yield (
+                f"<entry name='rule-{i:05d}'>"
+                f"<from><member>{rng.choice(ZONES)}</member></from>"
+                f"<to><member>{rng.choice(ZONES)}</member></to>"
+                f"<source>{src}</source><destination>{dst}</destination>"
+                f"<application><member>{rng.choice(APPLICATIONS)}</member></application>"
+                "<service><member>application-default</member></service>"
+                f"<tag><member>team-{i % 10}</member></tag>"
+                f"<action>{'deny' if i % 11 == 0 else 'allow'}</action>{disabled}</entry>"
+            )
+
+    def _hit_entries(self):
+        rng = random.Random(self.seed + 1)
+        for i in range(self.rules):
+            last = rng.choice((0, 1700000000 + i))
+            yield (
+                f"<entry name='rule-{i:05d}'><hit-count>{rng.randint(0, 10**6)}</hit-count>"
+                f"<last-hit-timestamp>{last}</last-hit-timestamp>"
+                f"<first-hit-timestamp>{last and 1690000000}</first-hit-timestamp></entry>"
+            )
+
+    def _route_entries(self):
+        base = int(ipaddress.IPv4Address("11.0.0.0"))
+        for i in range(self.routes):
+            if i % 50 == 49:
+                destination = f"2001:db8:{i % 65536:x}::/48"
+            else:
+                destination = f"{ipaddress.IPv4Address(base + (i << 8))}/24"
+            yield (
+                f"<entry><virtual-router>{'default' if i % 10 else 'vr-dmz'}</virtual-router>"
+                f"<destination>{destination}</destination><nexthop>192.0.2.1</nexthop>"
+                f"<metric>10</metric><flags>{ROUTE_FLAGS[i % len(ROUTE_FLAGS)]}</flags>"
+                "<age>1234</age><interface>ethernet1/1</interface></entry>"
+            )
+
+    def _objects(self) -> str:
+        addresses = "".join(
+            f"<entry name='addr-{i}'><ip-netmask>172.16.{i}.0/24</ip-netmask>"
+            f"<tag><member>{'web' if i % 2 else 'db'}</member></tag></entry>"
+            for i in range(200)
+        )
+        groups = "".join(
+            f"<entry name='grp-{i}'><static>"
+            + "".join(f"<member>addr-{j}</member>" for j in range(i * 10, i * 10 + 10))
+            + "</static></entry>"
+            for i in range(19)
+        ) + "<entry name='grp-19'><dynamic><filter>'web'</filter></dynamic></entry>"
+        return f"<result><address>{addresses}</address><address-group>{groups}</address-group></result>"
+
+
+SYSTEM_INFO = (
+    "<result><system><hostname>bench-fw</hostname><ip-address>192.0.2.10</ip-address>"
+    "<model>PA-440</model><serial>BENCH000001</serial><sw-version>11.1.2</sw-version>"
+    "<family>400</family><app-version>8800-8500</app-version><app-release-date>2024/01/01</app-release-date>"
+    "<threat-version>8800-8500</threat-version><threat-release-date>2024/01/01</threat-release-date>"
+    "<av-version>4700-5200</av-version><wildfire-version>0</wildfire-version>"
+    "<uptime>3 days, 2:00:00</uptime><platform-family>400</platform-family></system></result>"
+)
+
+
+def _top_output() -> str:
+    return (
+        "top - 10:00:00 up 3 days,  2:00,  0 users,  load average: 1.00, 1.00, 1.00\n"
+        "Tasks: 200 total,   1 running, 199 sleeping,   0 stopped,   0 zombie\n"
+        f"%Cpu(s): {random.uniform(2, 30):.1f} us,  {random.uniform(1, 10):.1f} sy,  0.0 ni, 80.0 id\n"
+    )
+
+
+def _resource_monitor() -> str:
+    cores = "".join(
+        f"<entry><coreid>{core}</coreid><value>"
+        + ",".join(str(random.randint(0, 60) if core else 0) for _ in range(60))
+        + "</value></entry>"
+        for core in range(8)
+    )
+    resources = "".join(
+        f"<entry><name>{name}</name><value>"
+        + ",".join(str(random.randint(0, 20)) for _ in range(60))
+        + "</value></entry>"
+        for name in ("packet buffer", "packet descriptor", "packet descriptor (on-chip)")
+    )
+    return (
+        "<result><resource-monitor><data-processors><dp0><second>"
+        f"<cpu-load-average>{cores}</cpu-load-average>"
+        f"<resource-utilization>{resources}</resource-utilization>"
+        "</second></dp0></data-processors></resource-monitor></result>"
+    )
+
+
+def _xml(body: str, status: str = "success", code: str | None = None) -> web.Response:
+    code_attr = f' code="{code}"' if code else ""
+    return web.Response(
+        text=f'<response status="{status}"{code_attr}>{body}</response>',
+        content_type="application/xml",
+        status=403 if code == "403" else 200,
+    )
+
+
+async def serve(args) -> None:
+    firewall = MockFirewall(args.rules, args.routes, args.latency)
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_route("*", "/api/", firewall.handle_api)
+    app.router.add_post("/bench/config-change", firewall.handle_config_change)
+
+    ca = trustme.CA()
+    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ca.issue_cert("127.0.0.1", "localhost").configure_cert(ssl_context)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port, ssl_context=ssl_context)
+    await site.start()
+    port = runner.addresses[0][1]
+    print(f"listening on {port}", flush=True)
+    await asyncio.Event().wait()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, default=1000)
+    parser.add_argument("--routes", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
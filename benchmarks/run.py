@@ -0,0 +1,223 @@
+"""End-to-end benchmark of the PAN Firewall integration.
+
+Starts ``mock_panos`` in a subprocess, sets the integration up in a test
+Home Assistant instance against it and measures, per poll:
+
+* wall time of the coordinator refresh (plus state writes settling),
+* CPU time of this process and time spent in executor jobs,
+* peak RSS of this process (the mock runs in its own process),
+* state writes (``state_changed`` events) and the coordinator's
+  issued/skipped counters.
+
+Run from the repository root:
+
+    python -m benchmarks.run --rules 10000 --routes 500000
+    python -m benchmarks.run --matrix          # every size, one process each
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+RULE_SIZES = (10, 1000, 10000, 50000)
+ROUTE_SIZES = (1000, 500000)
+
+
+class TimedExecutor(ThreadPoolExecutor):
+    """Default executor that adds up how long its jobs ran."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, /, *args, **kwargs):
+        def timed():
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.busy += time.perf_counter() - start
+
+        return super().submit(timed)
+
+
+async def _start_mock(args) -> tuple[asyncio.subprocess.Process, int]:
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "benchmarks.mock_panos",
+        "--rules", str(args.rules), "--routes", str(args.routes), "--latency", str(args.latency),
+        stdout=asyncio.subprocess.PIPE,
+    )
+    line = (await proc.stdout.readline()).decode()
+    if not line.startswith("listening on "):
+        proc.kill()
+        raise RuntimeError(f"mock_panos did not start: {line!r}")
+    return proc, int(line.split()[-1])
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+async def run_scenario(args) -> list[dict]:
+    # Imported here so --matrix and --help work without Home Assistant.
+    from homeassistant import loader
+    from homeassistant.const import EVENT_STATE_CHANGED
+    from homeassistant.helpers import entity_registry as er
+    from homeassistant.helpers.aiohttp_client import async_get_clientsession
+    from pytest_homeassistant_custom_component.common import MockConfigEntry, async_test_home_assistant
+
+    from custom_components.pan_firewall.const import (
+        CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_SCAN_INTERVAL, CONF_USERNAME, CONF_VERIFY_SSL,
+        DOMAIN, TIER_FAST, TIER_SLOW, TIER_STATIC,
+    )
+
+    proc, port = await _start_mock(args)
+    results = []
+    try:
+        async with async_test_home_assistant() as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+            executor = TimedExecutor(max_workers=8)
+            hass.loop.set_default_executor(executor)
+
+            writes = 0
+
+            def count_write(_event) -> None:
+                nonlocal writes
+                writes += 1
+
+            hass.bus.async_listen(EVENT_STATE_CHANGED, count_write)
+
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                title="bench",
+                data={
+                    CONF_HOST: "127.0.0.1",
+                    CONF_PORT: port,
+                    CONF_USERNAME: "admin",
+                    CONF_PASSWORD: "admin",
+                    CONF_VERIFY_SSL: False,
+                    CONF_SCAN_INTERVAL: 3600,
+                },
+            )
+            entry.add_to_hass(hass)
+
+            async def measure(label: str, action) -> None:
+                nonlocal writes
+                writes = 0
+                busy = executor.busy
+                cpu = time.process_time()
+                start = time.perf_counter()
+                await action()
+                await hass.async_block_till_done()
+                wall = time.perf_counter() - start
+                coordinator = hass.data[DOMAIN][entry.entry_id]["devices"][0]["coordinator"]
+                results.append(
+                    {
+                        "rules": args.rules,
+                        "routes": args.routes,
+                        "step": label,
+                        "wall_s": round(wall, 3),
+                        "cpu_s": round(time.process_time() - cpu, 3),
+                        "executor_s": round(executor.busy - busy, 3),
+                        "peak_rss_mib": round(_peak_rss_mib(), 1),
+                        "state_writes": writes,
+                        "writes_issued": coordinator.state_writes_issued,
+                        "writes_skipped": coordinator.state_writes_skipped,
+                    }
+                )
+
+            await measure("setup", lambda: hass.config_entries.async_setup(entry.entry_id))
+
+            if args.enable_rule_switches:
+                # Rule switches are disabled by default; enable them all to
+                # measure the worst case.
+                registry = er.async_get(hass)
+                for reg_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+                    if reg_entry.disabled_by is not None:
+                        registry.async_update_entity(reg_entry.entity_id, disabled_by=None)
+                await measure("reload", lambda: hass.config_entries.async_reload(entry.entry_id))
+
+            coordinator = hass.data[DOMAIN][entry.entry_id]["devices"][0]["coordinator"]
+
+            for i in range(args.polls):
+                await measure(f"fast #{i + 1}", coordinator.async_refresh)
+
+            async def full_poll():
+                coordinator.request_tier_refresh(TIER_FAST, TIER_SLOW, TIER_STATIC)
+                await coordinator.async_refresh()
+
+            await measure("all tiers, config unchanged", full_poll)
+
+            async def config_change():
+                # A commit made outside HA: the next slow poll refetches
+                # the whole rulebase and the objects.
+                session = async_get_clientsession(hass, verify_ssl=False)
+                async with session.post(f"https://127.0.0.1:{port}/bench/config-change"):
+                    pass
+                await full_poll()
+
+            await measure("all tiers, config changed", config_change)
+
+            await hass.config_entries.async_unload(entry.entry_id)
+    finally:
+        proc.kill()
+        await proc.wait()
+    return results
+
+
+def _print_table(rows: list[dict]) -> None:
+    columns = list(rows[0])
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row[c]).ljust(widths[c]) for c in columns))
+
+
+def _run_matrix(args) -> list[dict]:
+    """One subprocess per size, so peak RSS is not carried over."""
+    rows = []
+    for rules in RULE_SIZES:
+        for routes in ROUTE_SIZES:
+            cmd = [
+                sys.executable, "-m", "benchmarks.run", "--json",
+                "--rules", str(rules), "--routes", str(routes),
+                "--latency", str(args.latency), "--polls", str(args.polls),
+            ]
+            if args.enable_rule_switches:
+                cmd.append("--enable-rule-switches")
+            out = subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=os.getcwd())
+            rows.extend(json.loads(out.stdout))
+    return rows
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the PAN Firewall integration")
+    parser.add_argument("--rules", type=int, default=1000)
+    parser.add_argument("--routes", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0, help="mock latency per request, seconds")
+    parser.add_argument("--polls", type=int, default=3, help="fast-tier polls to measure")
+    parser.add_argument("--enable-rule-switches", action="store_true")
+    parser.add_argument("--matrix", action="store_true", help=f"rules {RULE_SIZES} x routes {ROUTE_SIZES}")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    rows = _run_matrix(args) if args.matrix else asyncio.run(run_scenario(args))
+    if args.json:
+        print(json.dumps(rows))
+    else:
+        _print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
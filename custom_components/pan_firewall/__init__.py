@@ -1,16 +1,35 @@
 """PAN Firewall integration."""
 
-from datetime import timedelta
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
 import logging
 import re
+import time
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-import panos.firewall
-import panos.policies
-
+from .adaptive import AdaptiveInterval
+from .api import PanOsClient, REQUEST_STATS, XPATH_VSYS, XPATH_VSYS_ENTRIES, parse_vsys
+from .breaker import CircuitBreaker
+from .commit import COMMIT_FAILED, CommitScheduler
+from .objects import ObjectsCollector, objects_xpath
+from .panorama import PanoramaFleet, device_facts
+from .policy import PolicyEngine
+from .resources import parse_resource_monitor
+from .routes import RouteCollector
+from .rules import HitCountCollector, RulebaseCollector, RULEBASES, hit_count_cmd
+from .scheduler import PRIORITY_BACKGROUND, PRIORITY_USER, async_get_scheduler
+from .services import async_setup_services
+from .snapshot import SAVE_DELAY, async_load_snapshot, encode, snapshot_store
+from .stats import CommandStats, RingBuffer
 from .const import (
     DOMAIN,
     CONF_HOST,
@@ -19,68 +38,211 @@ from .const import (
     CONF_PASSWORD,
     CONF_VSYS,
     CONF_VERIFY_SSL,
+    CONF_DEVICE_TYPE,
+    DEVICE_TYPE_PANORAMA,
     DEFAULT_PORT,
     DEFAULT_VSYS,
     DEFAULT_VERIFY_SSL,
     CONF_SCAN_INTERVAL,
     DEFAULT_SCAN_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    CONF_MAX_CONCURRENCY,
+    DEFAULT_MAX_CONCURRENCY,
+    CONF_SLOW_SCAN_INTERVAL,
+    DEFAULT_SLOW_SCAN_INTERVAL,
+    CONF_STATIC_SCAN_INTERVAL,
+    DEFAULT_STATIC_SCAN_INTERVAL,
+    TIER_FAST,
+    TIER_SLOW,
+    TIER_STATIC,
+    CONF_COMMIT_DELAY,
+    DEFAULT_COMMIT_DELAY,
+    HISTORY_SIZE,
+    HISTORY_WINDOW,
+    CONF_UNUSED_RULE_DAYS,
+    DEFAULT_UNUSED_RULE_DAYS,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = ["switch", "sensor", "button"]
 
+# Deadline per poll command (fetcher name → seconds); the streamed ones
+# can legitimately take a while on large configs.
+FETCH_TIMEOUTS = {
+    "_fetch_rules": 120,
+    "_fetch_rule_hits": 60,
+    "_fetch_routes": 120,
+}
+DEFAULT_FETCH_TIMEOUT = 20
+
+# What _run_fetcher returns for a command whose circuit breaker is open.
+SKIPPED = object()
+
+# Fast metrics that keep a rolling history for windowed statistics
+HISTORY_KEYS = (
+    "concurrent_connections",
+    "connections_per_second",
+    "total_throughput_kbps",
+    "dataplane_cpu",
+    "management_cpu",
+)
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    fw = panos.firewall.Firewall(
-        hostname=entry.data[CONF_HOST],
-        api_username=entry.data[CONF_USERNAME],
-        api_password=entry.data[CONF_PASSWORD],
+    client = PanOsClient(
+        async_get_clientsession(hass, verify_ssl=entry.data.get(CONF_VERIFY_SSL, DEFAULT_VERIFY_SSL)),
+        host=entry.data[CONF_HOST],
         port=entry.data.get(CONF_PORT, DEFAULT_PORT),
-        verify=entry.data.get(CONF_VERIFY_SSL, DEFAULT_VERIFY_SSL),
+        username=entry.data[CONF_USERNAME],
+        password=entry.data[CONF_PASSWORD],
     )
 
-    def refresh_system():
-        system_info = fw.refresh_system_info()
-        return {
-            "serial": getattr(fw, "serial", None) or getattr(system_info, "serial", None) or entry.data[CONF_HOST],
-            "model": getattr(system_info, "model", None) or getattr(system_info, "platform", None) or "PAN-OS Firewall",
-            "version": getattr(system_info, "version", None),
-            "hostname": getattr(system_info, "hostname", None) or entry.data[CONF_HOST],
-        }
+    # Options (set after setup) override what the config flow stored.
+    settings = {**entry.data, **entry.options}
+
+    if entry.data.get(CONF_DEVICE_TYPE) == DEVICE_TYPE_PANORAMA:
+        devices = await _async_setup_fleet(hass, entry, client, settings)
+    else:
+        device = await _async_setup_device(hass, entry, client, settings, snapshot_store(hass, entry.entry_id))
+        devices = [device]
+        hass.config_entries.async_update_entry(entry, title=device["hostname"])
+
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {"devices": devices}
 
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    return True
+
+
+async def _async_setup_fleet(hass: HomeAssistant, entry: ConfigEntry, client: PanOsClient, settings: dict) -> list:
+    """One device per firewall connected to Panorama, all polled through it.
+
+    Requests are routed to each firewall with ``target=<serial>``; the
+    firewalls share Panorama's API key, connection pool, concurrency limit
+    and device list (see PanoramaFleet).
+    """
+    fleet = PanoramaFleet(client, settings.get(CONF_STATIC_SCAN_INTERVAL, DEFAULT_STATIC_SCAN_INTERVAL))
     try:
-        info = await hass.async_add_executor_job(refresh_system)
-        serial = info["serial"]
-        hostname = info["hostname"]
-        _LOGGER.info("✅ Connected to PAN firewall %s (hostname: %s)", serial, hostname)
+        managed = await fleet.async_devices()
     except Exception as err:
-        _LOGGER.warning("Could not fetch system info: %s", err)
-        serial = entry.data[CONF_HOST]
-        hostname = entry.data[CONF_HOST]
-        info = {"model": "PAN-OS Firewall", "version": "Unknown"}
-
-    scan_interval = entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        raise ConfigEntryNotReady(f"Could not list the firewalls managed by Panorama: {err}") from err
+
+    semaphore = asyncio.Semaphore(settings.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY))
+    devices = []
+    for serial, managed_device in managed.items():
+        if not managed_device["connected"]:
+            _LOGGER.info("Skipping firewall %s: not connected to Panorama", serial)
+            continue
+        devices.append(
+            await _async_setup_device(
+                hass,
+                entry,
+                client.for_target(serial),
+                settings,
+                snapshot_store(hass, entry.entry_id, serial),
+                fleet=fleet,
+                semaphore=semaphore,
+                facts=device_facts(managed_device),
+                seed={"system_info": await fleet.async_system_info(serial)},
+            )
+        )
+    _LOGGER.info("✅ Connected to Panorama %s managing %s firewall(s)", entry.data[CONF_HOST], len(devices))
+    return devices
+
+
+async def _async_setup_device(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    fw: PanOsClient,
+    settings: dict,
+    store,
+    fleet: PanoramaFleet | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    facts: dict | None = None,
+    seed: dict | None = None,
+) -> dict:
+    """Coordinator and commit scheduler of one firewall, as stored in hass.data."""
+    # Data saved by the previous run lets the entities come up without
+    # waiting for the firewall; the first poll then runs in the background.
+    snapshot = await async_load_snapshot(store)
+    if snapshot is not None:
+        facts = {**snapshot[1], **(facts or {})}
+        seed = snapshot[0]
 
     coordinator = PanFirewallCoordinator(
-        hass, fw, entry.data.get(CONF_VSYS, DEFAULT_VSYS), scan_interval
+        hass,
+        fw,
+        entry.data.get(CONF_VSYS, DEFAULT_VSYS),
+        {
+            TIER_FAST: settings.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+            TIER_SLOW: settings.get(CONF_SLOW_SCAN_INTERVAL, DEFAULT_SLOW_SCAN_INTERVAL),
+            TIER_STATIC: settings.get(CONF_STATIC_SCAN_INTERVAL, DEFAULT_STATIC_SCAN_INTERVAL),
+        },
+        settings.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+        settings.get(CONF_UNUSED_RULE_DAYS, DEFAULT_UNUSED_RULE_DAYS),
+        max_interval=settings.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+        store=store,
+        facts=facts,
+        semaphore=semaphore,
+        fleet=fleet,
     )
+    entry.async_on_unload(coordinator.scheduler.async_register(coordinator))
 
-    await coordinator.async_config_entry_first_refresh()
+    if seed is not None and coordinator.facts.get("serial"):
+        coordinator.async_restore(seed)
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {coordinator.facts['serial']}"
+        )
+    else:
+        # The static tier of the first poll fills in the device facts.
+        await coordinator.async_config_entry_first_refresh()
+
+    facts = coordinator.facts
+    serial = facts.get("serial") or entry.data[CONF_HOST]
+    hostname = facts.get("hostname") or entry.data[CONF_HOST]
+    if fleet is None:
+        _LOGGER.info("✅ Connected to PAN firewall %s (hostname: %s)", serial, hostname)
+
+    async def on_committed():
+        # A commit changes the running config: refetch the rulebases (only
+        # of the vsys we wrote to, when nothing else went out with it).
+        coordinator.async_note_commit(
+            commit_scheduler.job_id,
+            commit_scheduler.pending_changes > 0,
+            failed=commit_scheduler.state == COMMIT_FAILED,
+        )
+        coordinator.request_tier_refresh(TIER_SLOW)
+        await coordinator.async_request_refresh()
 
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+    commit_scheduler = CommitScheduler(
+        hass, fw, settings.get(CONF_COMMIT_DELAY, DEFAULT_COMMIT_DELAY), on_committed
+    )
+    entry.async_on_unload(commit_scheduler.async_shutdown)
+
+    return {
         "coordinator": coordinator,
+        "commit_scheduler": commit_scheduler,
         "fw": fw,
         "serial": serial,
         "hostname": hostname,
-        "model": info["model"],
-        "version": info["version"],
+        "model": facts.get("model") or "PAN-OS Firewall",
+        "version": facts.get("version") or "Unknown",
     }
 
-    hass.config_entries.async_update_entry(entry, title=hostname)
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    return True
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload when the polling options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -90,114 +252,735 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the saved data of a removed firewall (or of every fleet member)."""
+    await snapshot_store(hass, entry.entry_id).async_remove()
+    if entry.data.get(CONF_DEVICE_TYPE) == DEVICE_TYPE_PANORAMA:
+        for device in dr.async_entries_for_config_entry(dr.async_get(hass), entry.entry_id):
+            for domain, serial in device.identifiers:
+                if domain == DOMAIN:
+                    await snapshot_store(hass, entry.entry_id, serial).async_remove()
+
+
 class PanFirewallCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass: HomeAssistant, fw, vsys: str, scan_interval: int):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        fw,
+        vsys: str,
+        tier_intervals: dict,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        unused_rule_days: int = DEFAULT_UNUSED_RULE_DAYS,
+        max_interval: int = DEFAULT_MAX_SCAN_INTERVAL,
+        store=None,
+        facts: dict | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+        fleet: PanoramaFleet | None = None,
+    ):
+        # The coordinator ticks at the fast tier; slower tiers are only
+        # fetched on the ticks where they are due. The tick itself adapts to
+        # how the firewall copes (see AdaptiveInterval).
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=scan_interval),
+            update_interval=timedelta(seconds=tier_intervals[TIER_FAST]),
         )
         self.fw = fw
-        self.vsys = vsys
-        self.rulebase = None
-
-    async def _async_update_data(self):
-        def fetch_all():
-            data = {}
-
-            # Rules
-            try:
-                if self.rulebase is None:
-                    self.rulebase = panos.policies.Rulebase()
-                    self.fw.add(self.rulebase)
-
-                security = panos.policies.SecurityRule.refreshall(self.rulebase)
-                nat = panos.policies.NatRule.refreshall(self.rulebase)
-                decryption = panos.policies.DecryptionRule.refreshall(self.rulebase)
-
-                data["security_rules"] = {r.name: r for r in security}
-                data["nat_rules"] = {r.name: r for r in nat}
-                data["decryption_rules"] = {r.name: r for r in decryption}
-            except Exception as e:
-                _LOGGER.error(f"Rulebase fetch failed: {e}")
-                data["security_rules"] = data["nat_rules"] = data["decryption_rules"] = {}
-
-            # Commit pending status (exact command you gave)
-            try:
-                root = self.fw.op("<check><pending-changes></pending-changes></check>")
-                pending_text = root.findtext(".") or root.findtext(".//") or "yes"
-                pending_text = pending_text.strip().lower()
-                data["commit_pending"] = pending_text
-                _LOGGER.info(f"Commit pending status: {pending_text}")
-            except Exception as e:
-                _LOGGER.error(f"Pending changes check failed: {e}")
-                data["commit_pending"] = "unknown"
-
-            # Other metrics
-            try:
-                root = self.fw.op("show running resource-monitor second")
-                total_util = 0.0
-                count = 0
-                for elem in root.iter():
-                    if elem.text and '%' in elem.text:
-                        try:
-                            val = float(re.search(r'(\d+\.?\d*)%', elem.text).group(1))
-                            if val > 0:
-                                total_util += val
-                                count += 1
-                        except (AttributeError, ValueError):
-                            pass
-                data["dataplane_cpu"] = round(total_util / count, 1) if count > 0 else 0.0
-            except Exception as e:
-                _LOGGER.error("Dataplane CPU failed: %s", e)
-                data["dataplane_cpu"] = None
+        # ``vsys`` is the setting: one name, a comma-separated list or "all".
+        # The first vsys (vsys1 for "all") keeps the data keys and entity
+        # ids it had before multi-vsys support, see vsys_key.
+        self._configured_vsys = parse_vsys(vsys)
+        self.vsys = self._configured_vsys[0] if self._configured_vsys else DEFAULT_VSYS
+        self.vsys_list = self._configured_vsys or (self.vsys,)
+        self.unused_rule_days = unused_rule_days
+        self._store = store
+        # serial/hostname/model/version from ``show system info``; only
+        # refreshed by the static tier, after a reboot or a new version.
+        self.facts = facts or {}
+        self._uptime = None
+        # (monotonic time, fields) of the last ``show system info``; its
+        # time and uptime are carried forward on every tick in between.
+        self._clock_base = None
+        # Last commit job the cached rulebases reflect; our own commits map
+        # to the vsys they touched (None: possibly any).
+        self._rules_version = None
+        self._own_commits = {}
+        self._touched_vsys = set()
+        self._foreign_changes = False
+        self._rules_cache = {}
+        self.address_books = {}
+        self.policies = defaultdict(PolicyEngine)
+        # Fleet members share Panorama's semaphore: one cap for the fleet.
+        self._semaphore = semaphore or asyncio.Semaphore(max_concurrency)
+        self.fleet = fleet
+        # Shared by every entry: staggering, global cap and rate limit.
+        self.scheduler = async_get_scheduler(hass)
+        self._user_refresh = False
+        self._tier_intervals = tier_intervals
+        self._tier_last_run = {}
+        self._forced_tiers = set()
+        self._adaptive = AdaptiveInterval(tier_intervals[TIER_FAST], max_interval)
+        self.effective_scan_interval = tier_intervals[TIER_FAST]
+        self._breakers = {}
+        self._save_due = None
+        # Paths of data that changed in the last refresh; None means "notify
+        # every listener" (first refresh, set_updated_data, ...).
+        self._changed_paths = None
+        self._notified_success = None
+        self.state_writes_issued = 0
+        self.state_writes_skipped = 0
+        self._history = {key: RingBuffer(HISTORY_SIZE) for key in HISTORY_KEYS}
+        self._fetchers = {
+            TIER_FAST: (
+                self._fetch_commit_pending,
+                self._fetch_dataplane_cpu,
+                self._fetch_session_info,
+                self._fetch_management_cpu,
+            ),
+            TIER_SLOW: (
+                self._fetch_rules,
+                self._fetch_rule_hits,
+                self._fetch_routes,
+            ),
+            TIER_STATIC: (
+                self._fetch_system_info,
+            ),
+        }
+        # Per poll command: latency histogram, bytes, parse time, failures
+        self.command_stats = {
+            _command_name(f.__name__): CommandStats() for fetchers in self._fetchers.values() for f in fetchers
+        }
 
-            try:
-                root = self.fw.op("show system info")
-                sys_dict = {}
-                for elem in root.iter():
-                    if elem.text and elem.text.strip():
-                        key = elem.tag.replace("-", "_")
-                        sys_dict[key] = elem.text.strip()
-                data["system_info"] = sys_dict
-            except Exception as e:
-                _LOGGER.error("System info failed: %s", e)
-                data["system_info"] = {}
+    @callback
+    def async_restore(self, data: dict) -> None:
+        """Start from data saved by a previous run.
+
+        The restored rulebases also seed the rule cache, but without a
+        config version, so the first slow poll still refetches them.
+        """
+        self.data = data
+        self.vsys_list = tuple(data.get("vsys_list") or self.vsys_list)
+        self._rules_cache = {
+            key: data.get(key, {})
+            for vsys in self.vsys_list
+            for key in (self.vsys_key(rule_type, vsys) for rule_type in RULEBASES.values())
+        }
+        self._rules_cache["vsys_list"] = list(self.vsys_list)
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        if self._store is None:
+            return
+        # async_delay_save restarts its timer on every call; with data that
+        # changes every poll it must not be re-armed before it has fired.
+        now = time.monotonic()
+        if self._save_due is not None and now < self._save_due:
+            return
+        self._save_due = now + SAVE_DELAY
+        self._store.async_delay_save(lambda: encode(self.data, self.facts), SAVE_DELAY)
+
+    def diagnostics(self) -> dict:
+        """Polling state for the config entry diagnostics download."""
+        data = self.data or {}
+        return {
+            "facts": self.facts,
+            "last_update_success": self.last_update_success,
+            "effective_scan_interval": self.effective_scan_interval,
+            "tier_intervals": self._tier_intervals,
+            "vsys": list(self.vsys_list),
+            "rules_version": self._rules_version,
+            "counts": {
+                key: len(value) for key, value in data.items() if isinstance(value, (dict, list))
+            },
+            "freshness": data.get("freshness", {}),
+            "state_writes": {
+                "issued": self.state_writes_issued,
+                "skipped": self.state_writes_skipped,
+            },
+            "commands": {name: stats.as_dict() for name, stats in self.command_stats.items()},
+            "breakers": {
+                _command_name(name): {"failures": breaker.failures, "open_until": breaker.open_until}
+                for name, breaker in self._breakers.items()
+                if breaker.failures
+            },
+        }
 
-            try:
-                root = self.fw.op("show session info")
-                data["concurrent_connections"] = int(root.findtext('.//num-active') or 0)
-                data["connections_per_second"] = int(root.findtext('.//cps') or 0)
-                data["total_throughput_kbps"] = int(root.findtext('.//kbps') or 0)
-            except Exception as e:
-                _LOGGER.error("Session info failed: %s", e)
-                data["concurrent_connections"] = data["connections_per_second"] = data["total_throughput_kbps"] = 0
+    async def async_request_refresh(self) -> None:
+        """Refresh soon, ahead of the background polls of every firewall.
+
+        This is the refresh after our own writes (commits, rule switches)
+        and ``homeassistant.update_entity``: someone is waiting for it.
+        """
+        self._user_refresh = True
+        await super().async_request_refresh()
+
+    def vsys_key(self, key: str, vsys: str | None = None) -> str:
+        """Key in ``data`` of a per-vsys value: ``security_rules_vsys2``.
+
+        Rulebases, hit counts and unused-rule counts are kept per vsys; the
+        first vsys keeps the plain key.
+        """
+        if vsys is None or vsys == self.vsys:
+            return key
+        return f"{key}_{vsys}"
+
+    def request_tier_refresh(self, *tiers: str) -> None:
+        """Fetch the given tiers on the next refresh even if they are not due."""
+        self._forced_tiers.update(tiers)
+
+    @callback
+    def async_set_rules_disabled(self, rule_type: str, names, disabled: bool, vsys: str | None = None) -> None:
+        """Show rule changes we just pushed before a poll can see them.
+
+        The changes are in the candidate config until the batched commit
+        runs, so the cached rulebase is updated too; the post-commit refetch
+        then replaces it with the running config.
+        """
+        vsys = vsys or self.vsys
+        if not self._touched_vsys and self.data.get("commit_pending") == "yes":
+            # Someone else's uncommitted changes go out with our commit and
+            # may touch any vsys.
+            self._foreign_changes = True
+        self._touched_vsys.add(vsys)
+
+        key = self.vsys_key(rule_type, vsys)
+        rules = dict(self.data.get(key, {}))
+        changed = {key}
+        for name in names:
+            if name in rules:
+                rules[name] = rules[name].replace(disabled=disabled)
+                changed.add((key, name))
+        self._rules_cache = {**self._rules_cache, key: rules}
+        self.data = {**self.data, key: rules}
+        self._changed_paths = changed
+        self.async_update_listeners()
+        self._async_schedule_save()
+
+    @callback
+    def async_note_commit(self, job_id: str | None, more_pending: bool, failed: bool = False) -> None:
+        """Remember which vsys one of our commits touched.
+
+        The next slow poll then only refetches those. Changes made while the
+        commit ran may or may not be in it, so they stay noted until nothing
+        is left uncommitted. A commit without our changes (Commit Now with
+        someone else's) may have touched anything.
+
+        A failed commit may not show up in the job list at all, so the
+        cached rulebases (with our uncommitted changes applied) are dropped.
+        """
+        if failed:
+            self._rules_version = None
+        elif job_id is not None:
+            touched = None if self._foreign_changes or not self._touched_vsys else frozenset(self._touched_vsys)
+            self._own_commits[int(job_id)] = touched
+        if not more_pending:
+            self._touched_vsys.clear()
+            self._foreign_changes = False
+
+    def _due_tiers(self, now: float) -> list[str]:
+        # Allow half a tick of slack so a 300 s tier polled every 30 s runs
+        # on the 10th tick rather than slipping to the 11th.
+        slack = self.update_interval.total_seconds() / 2
+        due = []
+        for tier, interval in self._tier_intervals.items():
+            last_run = self._tier_last_run.get(tier)
+            if tier in self._forced_tiers or last_run is None or now - last_run >= interval - slack:
+                due.append(tier)
+        return due
 
+    async def _async_update_data(self):
+        # User-triggered refreshes skip the stagger and jump the queue. The
+        # first poll without saved data holds up setup, so it is not
+        # staggered either (only capped and rate limited).
+        priority = PRIORITY_USER if self._user_refresh else PRIORITY_BACKGROUND
+        self._user_refresh = False
+        if priority == PRIORITY_BACKGROUND and self.data is not None:
+            await self.scheduler.async_wait_turn()
+
+        now = time.monotonic()
+        due = self._due_tiers(now)
+        self._forced_tiers.difference_update(due)
+
+        # Every fetcher is independent and returns its own slice of ``data``,
+        # so they run side by side (bounded by the per-firewall semaphore and
+        # the domain-wide scheduler) and the poll takes about as long as the
+        # slowest command.
+        fetchers = [f for tier in due for f in self._fetchers[tier]]
+
+        # A failed command leaves its keys at their last value; the poll only
+        # fails as a whole when no command got through.
+        # Commands paused by their breaker are skipped, not failed: they must
+        # not slow down the polling of the healthy ones.
+        results = await asyncio.gather(*(self._run_fetcher(f, priority) for f in fetchers))
+        if fetchers and all(result is None or result is SKIPPED for result in results):
+            self._adapt_interval(failed=any(result is None for result in results))
+            raise UpdateFailed("Error fetching firewall data: every command failed or is paused")
+
+        # Tiers that were not due keep their last value.
+        data = dict(self.data or {})
+        freshness = dict(data.get("freshness", {}))
+        fetched_at = time.time()
+        fast_failed = False
+        slow_keys = set()
+        for fetcher, result in zip(fetchers, results):
+            if result is SKIPPED:
+                continue
+            if result is None:
+                fast_failed = fast_failed or fetcher in self._fetchers[TIER_FAST]
+                continue
+            data.update(result)
+            freshness.update(dict.fromkeys(result, fetched_at))
+            if fetcher not in self._fetchers[TIER_FAST]:
+                slow_keys.update(result)
+            if "system_info" in result:
+                self._clock_base = (now, result["system_info"])
+            for key in HISTORY_KEYS:
+                if result.get(key) is not None:
+                    self._history[key].append(now, result[key])
+        data["freshness"] = freshness
+        if self._clock_base is not None:
+            # The static tier is polled rarely; time and uptime still move.
+            fetched, system_info = self._clock_base
+            data["system_info"] = _advance_clock(system_info, now - fetched)
+        for tier in due:
+            self._tier_last_run[tier] = now
+
+        data["metric_stats"] = {
+            key: history.stats(now, HISTORY_WINDOW) for key, history in self._history.items()
+        }
+        self._adapt_interval(failed=fast_failed, management_cpu=data.get("management_cpu"))
+
+        self._changed_paths = None if self.data is None else _changed_paths(self.data, data)
+        # Fast metrics (and the advanced clock) change on every tick; saving
+        # for them would re-encode every rulebase each SAVE_DELAY. They are
+        # written along with the next rulebase, hit count or fact change.
+        if self._changed_paths is None or not self._changed_paths.isdisjoint(slow_keys):
+            self._async_schedule_save()
+        return data
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the listeners whose part of ``data`` changed.
+
+        Entities pass the paths they read as their coordinator context (a
+        frozenset of top-level keys and ``(key, subkey)`` pairs). Listeners
+        without a context, and everyone after an availability change, are
+        always notified.
+        """
+        changed = self._changed_paths
+        self._changed_paths = None
+        notify_all = changed is None or self.last_update_success != self._notified_success
+        self._notified_success = self.last_update_success
+
+        due = []
+        skipped = 0
+        for update_callback, context in list(self._listeners.values()):
+            if notify_all or context is None or not changed.isdisjoint(context):
+                due.append(update_callback)
+            else:
+                skipped += 1
+
+        self.state_writes_issued = len(due)
+        self.state_writes_skipped = skipped
+        for update_callback in due:
+            update_callback()
+
+    def _adapt_interval(self, failed: bool, management_cpu: float | None = None) -> None:
+        # Only the fast commands are timed: the slow tier (whole rulebase,
+        # routing table) is large by nature and already polled rarely.
+        latencies = [
+            stats.latency_last
+            for f in self._fetchers[TIER_FAST]
+            if (stats := self.command_stats[_command_name(f.__name__)]).latency_last is not None
+        ]
+        interval = self._adaptive.next(max(latencies, default=None), management_cpu, failed)
+        self.update_interval = timedelta(seconds=interval)
+        self.effective_scan_interval = round(interval)
+
+    async def _run_fetcher(self, fetcher, priority: int = PRIORITY_BACKGROUND):
+        """Run one fetcher under its deadline; None when it failed, SKIPPED when paused."""
+        name = fetcher.__name__
+        breaker = self._breakers.setdefault(name, CircuitBreaker())
+        if not breaker.allow(time.monotonic()):
+            return SKIPPED
+
+        timeout = FETCH_TIMEOUTS.get(name, DEFAULT_FETCH_TIMEOUT)
+        stats = self.command_stats[_command_name(name)]
+        # Waiting for a slot does not count against the deadline.
+        async with self._semaphore, self.scheduler.slot(priority):
+            # Each fetcher runs in its own gather task, so the context
+            # variable only sees this command's requests.
+            token = REQUEST_STATS.set(stats)
+            start = time.monotonic()
+            failed = True
             try:
-                root = self.fw.op("show system resources")
-                text = root.findtext('.') or ""
-                match = re.search(r'%Cpu\(s\):\s*([\d.]+)\s*us,\s*([\d.]+)\s*sy', text)
-                if match:
-                    us = float(match.group(1))
-                    sy = float(match.group(2))
-                    data["management_cpu"] = round(us + sy, 1)
-                else:
-                    data["management_cpu"] = 0.0
-            except Exception as e:
-                _LOGGER.error("Management CPU failed: %s", e)
-                data["management_cpu"] = None
-
+                async with asyncio.timeout(timeout):
+                    result = await fetcher()
+                failed = False
+            except TimeoutError:
+                self._fetch_failed(name, breaker, f"timed out after {timeout} s")
+                return None
+            except Exception as err:
+                self._fetch_failed(name, breaker, err)
+                return None
+            finally:
+                stats.record_call(time.monotonic() - start, failed)
+                REQUEST_STATS.reset(token)
+
+        if breaker.failures:
+            _LOGGER.info("%s recovered after %s failure(s)", _fetch_label(name), breaker.failures)
+        breaker.record_success()
+        return result
+
+    def _fetch_failed(self, name: str, breaker: CircuitBreaker, reason) -> None:
+        # Logged once when a command starts failing and once when it gets
+        # paused; the repeats in between only at debug level.
+        first = breaker.failures == 0
+        if breaker.record_failure(time.monotonic()):
+            _LOGGER.warning(
+                "%s failed %s times in a row, pausing it for %s s: %s",
+                _fetch_label(name), breaker.failures, breaker.cooldown, reason,
+            )
+        elif first:
+            _LOGGER.warning("%s failed: %s", _fetch_label(name), reason)
+        else:
+            _LOGGER.debug("%s failed again: %s", _fetch_label(name), reason)
+
+    async def _fetch_commits(self) -> list[int]:
+        """Ids of the finished commit jobs, oldest first, to spot config changes.
+
+        The running config only changes on a commit, so as long as no new
+        id shows up the cached rulebases are still current.
+        """
+        root = await self.fw.async_op("show jobs all")
+        commits = []
+        for job in root.iterfind("./result/job"):
+            job_type = job.findtext("type") or ""
+            if job.findtext("status") == "FIN" and job_type.startswith(("Commit", "AutoCom")):
+                commits.append(int(job.findtext("id") or 0))
+        return sorted(commits)
+
+    def _stale_vsys(self, commits: list[int]) -> set | None:
+        """Vsys whose rulebase changed since it was fetched; None for all.
+
+        The job list does not say which vsys a commit changed. Our own
+        commits only touched the vsys we wrote to; any other commit (or
+        having no version) may have changed every vsys.
+        """
+        if not commits or self._rules_version is None:
+            return None
+        stale = set()
+        for job_id in commits:
+            if job_id <= self._rules_version:
+                continue
+            touched = self._own_commits.get(job_id)
+            if touched is None:
+                return None
+            stale |= touched
+        return stale
+
+    async def _fetch_rules(self):
+        try:
+            commits = await self._fetch_commits()
+        except Exception as e:
+            _LOGGER.warning("Config version check failed, refetching rules: %s", e)
+            commits = []
+
+        stale = self._stale_vsys(commits)
+        version = commits[-1] if commits else None
+        if version is not None:
+            self._own_commits = {job_id: vsys for job_id, vsys in self._own_commits.items() if job_id > version}
+        if stale is not None and not stale:
+            self._rules_version = version
+            return self._rules_cache
+
+        # A failure propagates and the previous rulebases stay in ``data``:
+        # an empty one would make the switch platform remove every rule
+        # entity. The version is only recorded once everything was read.
+        self._rules_version = None
+        if stale is None:
+            vsys_list = self._configured_vsys or await self._fetch_vsys_list()
+        else:
+            vsys_list = self.vsys_list
+        refetch = [vsys for vsys in vsys_list if stale is None or vsys in stale]
+
+        # The vsys are independent, so they are fetched side by side as far
+        # as the concurrency limits allow.
+        fetched = await self._gather_vsys(self._fetch_vsys_rules, refetch)
+
+        data = dict(self._rules_cache) if stale is not None else {}
+        for vsys, (rulebases, book) in zip(refetch, fetched):
+            for rule_type, rules in rulebases.items():
+                key = self.vsys_key(rule_type, vsys)
+                previous = self._rules_cache.get(key)
+                # An unchanged rulebase keeps its identity, so the switches
+                # and the policy index see nothing to redo.
+                data[key] = previous if rules == previous else rules
+            self.address_books[vsys] = book
+        for vsys in set(self.vsys_list) - set(vsys_list):
+            # Empty rulebases remove the switches of a vsys that was
+            # deleted (or is no longer configured).
+            _LOGGER.info("No longer polling vsys %s", vsys)
+            data.update({self.vsys_key(rule_type, vsys): {} for rule_type in RULEBASES.values()})
+            self.address_books.pop(vsys, None)
+            self.policies.pop(vsys, None)
+        data["vsys_list"] = list(vsys_list)
+
+        self.vsys_list = tuple(vsys_list)
+        self._rules_version = version
+        self._rules_cache = data
+        return data
+
+    async def _gather_vsys(self, fetch, vsys_list) -> list:
+        """Results of ``fetch(vsys)`` for every vsys, in order.
+
+        The fetcher already holds one slot of the per-firewall semaphore and
+        of the scheduler; further vsys only run in parallel on slots that are
+        free right now. Waiting for more would let one poll exceed the caps
+        (or deadlock two fetchers each holding a slot).
+        """
+        queue = list(vsys_list)
+        results = {}
+
+        async def worker(release=None):
             try:
-                root = self.fw.op("show routing route")
-                data["number_of_routes"] = len(root.findall('.//entry'))
-            except Exception as e:
-                _LOGGER.error("Routes failed: %s", e)
-                data["number_of_routes"] = 0
-
-            return data
+                while queue:
+                    vsys = queue.pop(0)
+                    results[vsys] = await fetch(vsys)
+            finally:
+                if release is not None:
+                    release()
+
+        def release_slot():
+            self._semaphore.release()
+            self.scheduler.release()
+
+        workers = [worker()]
+        for _ in range(len(queue) - 1):
+            if self._semaphore.locked() or not self.scheduler.try_acquire():
+                break
+            # Not locked, so this does not wait.
+            await self._semaphore.acquire()
+            workers.append(worker(release_slot))
+        await asyncio.gather(*workers)
+        return [results[vsys] for vsys in vsys_list]
+
+    async def _fetch_vsys_list(self) -> tuple[str, ...]:
+        """Names of the vsys in the running config (just vsys1 on most firewalls)."""
+        # Attribute xpaths (``entry/@name``) are not reliably supported by
+        # the config show, so the vsys entries are streamed and everything
+        # below them dropped as it is parsed.
+        names = []
+        depth = 0
+        async for event, elem in self.fw.async_show_config_events(XPATH_VSYS_ENTRIES):
+            if event == "start":
+                depth += 1
+                # <response><result><entry name="vsys1">
+                if depth == 3 and elem.tag == "entry" and elem.get("name"):
+                    names.append(elem.get("name"))
+            else:
+                depth -= 1
+                if depth >= 2:
+                    elem.clear()
+        return tuple(names) or (self.vsys,)
+
+    async def _fetch_vsys_rules(self, vsys: str):
+        """Rulebases and address/service objects of one vsys."""
+        # One request for the whole vsys rulebase, parsed as it streams in.
+        collector = RulebaseCollector()
+        async for event, elem in self.fw.async_show_config_events(f"{XPATH_VSYS.format(vsys=vsys)}/rulebase"):
+            collector.handle(event, elem)
+
+        # Address/service objects change with the rulebase; same gate.
+        objects = ObjectsCollector()
+        async for event, elem in self.fw.async_show_config_events(objects_xpath(vsys)):
+            objects.handle(event, elem)
+        return collector.rules, objects.book
+
+    async def _fetch_rule_hits(self):
+        # One bulk query for every security rule per vsys, parsed as it
+        # streams in; the vsys side by side as far as the limits allow.
+        vsys_list = self.vsys_list
+        hits = await self._gather_vsys(self._fetch_vsys_rule_hits, vsys_list)
+
+        cutoff = time.time() - self.unused_rule_days * 86400
+        data = {}
+        for vsys, vsys_hits in zip(vsys_list, hits):
+            data[self.vsys_key("rule_hits", vsys)] = vsys_hits
+            data[self.vsys_key("rules_unused", vsys)] = sum(1 for h in vsys_hits.values() if h.last_hit < cutoff)
+        return data
+
+    async def _fetch_vsys_rule_hits(self, vsys: str) -> dict:
+        collector = HitCountCollector()
+        async for event, elem in self.fw.async_op_events(hit_count_cmd(vsys)):
+            collector.handle(event, elem)
+        return collector.hits
+
+    async def _fetch_commit_pending(self):
+        root = await self.fw.async_op("<check><pending-changes></pending-changes></check>")
+        pending_text = (root.findtext("./result") or "yes").strip().lower()
+        _LOGGER.debug("Commit pending status: %s", pending_text)
+        return {"commit_pending": pending_text}
+
+    async def _fetch_dataplane_cpu(self):
+        root = await self.fw.async_op("show running resource-monitor second")
+        return parse_resource_monitor(root)
+
+    async def _fetch_system_info(self):
+        if self.fleet is not None:
+            # Shared by the whole fleet, one request per static interval.
+            sys_dict = await self.fleet.async_system_info(self.facts["serial"])
+            self._async_update_facts(sys_dict)
+            return {"system_info": sys_dict}
+
+        root = await self.fw.async_op("show system info")
+
+        # The fields are the direct children of <system>; nothing below
+        # them is shown.
+        sys_dict = {}
+        for elem in root.iterfind("./result/system/*"):
+            if elem.text and elem.text.strip():
+                sys_dict[elem.tag.replace("-", "_")] = elem.text.strip()
+        self._async_update_facts(sys_dict)
+        return {"system_info": sys_dict}
+
+    @callback
+    def _async_update_facts(self, system_info: dict) -> None:
+        facts = {
+            "serial": self.facts.get("serial") or system_info.get("serial"),
+            "hostname": system_info.get("hostname") or self.facts.get("hostname"),
+            "model": system_info.get("model") or self.facts.get("model"),
+            "version": system_info.get("sw_version") or self.facts.get("version"),
+        }
+        if facts == self.facts:
+            return
+        if self.facts and facts["version"] != self.facts.get("version"):
+            _LOGGER.info("Firewall %s now runs PAN-OS %s", facts["serial"], facts["version"])
+            self._async_update_device(facts)
+        self.facts = facts
+
+    @callback
+    def _async_update_device(self, facts: dict) -> None:
+        device_registry = dr.async_get(self.hass)
+        device = device_registry.async_get_device(identifiers={(DOMAIN, facts["serial"])})
+        if device is not None:
+            device_registry.async_update_device(device.id, sw_version=facts["version"], model=facts["model"])
+
+    async def _fetch_session_info(self):
+        root = await self.fw.async_op("show session info")
+        return {
+            "concurrent_connections": int(root.findtext('.//num-active') or 0),
+            "connections_per_second": int(root.findtext('.//cps') or 0),
+            "total_throughput_kbps": int(root.findtext('.//kbps') or 0),
+        }
 
-        try:
-            return await self.hass.async_add_executor_job(fetch_all)
-        except Exception as err:
-            raise UpdateFailed(f"Error fetching firewall data: {err}") from err
+    async def _fetch_management_cpu(self):
+        root = await self.fw.async_op("show system resources")
+        text = root.findtext('./result') or ""
+        self._check_uptime(text)
+        match = re.search(r'%Cpu\(s\):\s*([\d.]+)\s*us,\s*([\d.]+)\s*sy', text)
+        if match is None:
+            return {"management_cpu": 0.0}
+        return {"management_cpu": round(float(match.group(1)) + float(match.group(2)), 1)}
+
+    def _check_uptime(self, top_output: str) -> None:
+        """Refresh the device facts when the uptime went backwards (reboot).
+
+        A reboot is when a new PAN-OS version shows up, so the static tier
+        does not have to be polled often to notice it.
+        """
+        uptime = _uptime_seconds(top_output)
+        if uptime is None:
+            return
+        if self._uptime is not None and uptime < self._uptime:
+            _LOGGER.info("Firewall %s rebooted, refreshing system info", self.facts.get("serial"))
+            self.request_tier_refresh(TIER_STATIC)
+        self._uptime = uptime
+
+    async def _fetch_routes(self):
+        # Full BGP tables can hold hundreds of thousands of entries, so
+        # they are counted as they stream in instead of parsed as a tree.
+        collector = RouteCollector()
+        async for event, elem in self.fw.async_op_events("show routing route"):
+            collector.handle(event, elem)
+        return collector.as_data()
+
+
+def _command_name(name: str) -> str:
+    """``_fetch_rule_hits`` → ``rule_hits``."""
+    return name.removeprefix("_fetch_")
+
+
+def _fetch_label(name: str) -> str:
+    """``_fetch_rule_hits`` → ``Rule hits``."""
+    return name.removeprefix("_fetch_").replace("_", " ").capitalize()
+
+
+_TOP_UPTIME = re.compile(r"^top - \S+ up (.+?),\s+\d+ users?", re.MULTILINE)
+
+
+def _uptime_seconds(top_output: str) -> int | None:
+    """Uptime from the first line of ``top``, e.g. ``up 12 days,  3:04``."""
+    match = _TOP_UPTIME.search(top_output)
+    if match is None:
+        return None
+    text = match.group(1)
+    seconds = 0
+    if days := re.search(r"(\d+) days?", text):
+        seconds += int(days.group(1)) * 86400
+    if clock := re.search(r"(\d+):(\d+)", text):
+        seconds += int(clock.group(1)) * 3600 + int(clock.group(2)) * 60
+    if minutes := re.search(r"(\d+) min", text):
+        seconds += int(minutes.group(1)) * 60
+    return seconds
+
+
+_SYSTEM_UPTIME = re.compile(r"^(\d+) days?, (\d+):(\d+):(\d+)$")
+_SYSTEM_TIME_FORMAT = "%a %b %d %H:%M:%S %Y"
+
+
+def _advance_clock(system_info: dict, elapsed: float) -> dict:
+    """``system_info`` with its ``time`` and ``uptime`` moved on by ``elapsed`` seconds.
+
+    Fields in an unknown format are left as they were fetched.
+    """
+    elapsed = int(elapsed)
+    if not elapsed:
+        return system_info
+    advanced = dict(system_info)
+    try:
+        clock = datetime.strptime(system_info.get("time", ""), _SYSTEM_TIME_FORMAT)
+    except ValueError:
+        pass
+    else:
+        # Same layout as PAN-OS: ``Thu Oct  6 10:22:33 2026``
+        advanced["time"] = (clock + timedelta(seconds=elapsed)).ctime()
+    if match := _SYSTEM_UPTIME.match(system_info.get("uptime", "")):
+        days, hours, minutes, seconds = map(int, match.groups())
+        total = days * 86400 + hours * 3600 + minutes * 60 + seconds + elapsed
+        hours, rest = divmod(total % 86400, 3600)
+        advanced["uptime"] = f"{total // 86400} days, {hours}:{rest // 60:02}:{rest % 60:02}"
+    return advanced
+
+
+def _changed_paths(old: dict, new: dict) -> set:
+    """Top-level keys and ``(key, subkey)`` pairs that differ between two polls."""
+    changed = set()
+    for key in old.keys() | new.keys():
+        old_value = old.get(key)
+        new_value = new.get(key)
+        if old_value is new_value:
+            continue
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            sub = {
+                (key, subkey)
+                for subkey in old_value.keys() | new_value.keys()
+                if old_value.get(subkey) != new_value.get(subkey)
+            }
+            if sub:
+                changed.add(key)
+                changed.update(sub)
+        elif old_value != new_value:
+            changed.add(key)
+    return changed
@@ -0,0 +1,48 @@
+"""Adaptive poll interval for PAN Firewall."""
+
+import random
+
+# Poll at most this share of the time: commands taking 3 s mean at least 15 s
+# between polls.
+MAX_DUTY_CYCLE = 0.2
+# Management CPU (%) above which polling slows down, reaching 3x at 100 %.
+CPU_THRESHOLD = 50
+MAX_BACKOFF_STEPS = 5
+JITTER = 0.1
+LATENCY_SMOOTHING = 0.3
+
+
+class AdaptiveInterval:
+    """Stretch or shrink the fast-tier interval between two bounds.
+
+    The configured scan interval is the floor. The interval grows with the
+    (smoothed) command latency, with management CPU above
+    ``CPU_THRESHOLD`` and doubles per consecutive failed poll, capped at
+    ``maximum``. A ±10 % jitter keeps several firewalls from polling in
+    lockstep.
+    """
+
+    def __init__(self, minimum: float, maximum: float):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.latency = None
+        self.failures = 0
+
+    def next(self, latency: float | None, management_cpu: float | None, failed: bool) -> float:
+        """Interval in seconds after a poll with the given observations."""
+        if latency is not None:
+            self.latency = (
+                latency if self.latency is None
+                else self.latency + LATENCY_SMOOTHING * (latency - self.latency)
+            )
+        self.failures = self.failures + 1 if failed else 0
+
+        interval = self.minimum
+        if self.latency is not None:
+            interval = max(interval, self.latency / MAX_DUTY_CYCLE)
+        if management_cpu is not None and management_cpu > CPU_THRESHOLD:
+            interval *= 1 + 2 * (management_cpu - CPU_THRESHOLD) / (100 - CPU_THRESHOLD)
+        interval *= 2 ** min(self.failures, MAX_BACKOFF_STEPS)
+
+        interval *= random.uniform(1 - JITTER, 1 + JITTER)
+        return min(max(interval, self.minimum), self.maximum)
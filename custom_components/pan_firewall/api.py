@@ -0,0 +1,303 @@
+"""Async PAN-OS XML API client."""
+
+import asyncio
+from contextvars import ContextVar
+import copy
+import logging
+import time
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+import aiohttp
+
+from .const import DEFAULT_VSYS, VSYS_ALL
+
+_LOGGER = logging.getLogger(__name__)
+
+XPATH_VSYS = "/config/devices/entry[@name='localhost.localdomain']/vsys/entry[@name='{vsys}']"
+XPATH_VSYS_ENTRIES = "/config/devices/entry[@name='localhost.localdomain']/vsys/entry"
+
+JOB_POLL_INTERVAL = 2
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Set by the coordinator around each poll command; responses add their size
+# and parse time to it (see stats.CommandStats.add_response).
+REQUEST_STATS = ContextVar("pan_firewall_request_stats", default=None)
+
+
+class PanOsApiError(Exception):
+    """The firewall returned an error response."""
+
+
+class PanOsAuthError(PanOsApiError):
+    """The firewall rejected the credentials or API key."""
+
+
+def cmd_xml(cmd: str) -> str:
+    """Turn ``show system info`` into ``<show><system><info/></system></show>``.
+
+    Commands that already are XML are returned unchanged.
+    """
+    if cmd.lstrip().startswith("<"):
+        return cmd
+    words = cmd.split()
+    return "".join(f"<{w}>" for w in words) + "".join(f"</{w}>" for w in reversed(words))
+
+
+def parse_vsys(setting: str) -> tuple[str, ...] | None:
+    """The VSYS setting as names: ``vsys1, vsys2`` → ``("vsys1", "vsys2")``.
+
+    None for ``all``: the vsys are discovered from the running config.
+    """
+    names = tuple(dict.fromkeys(name.strip() for name in setting.split(",") if name.strip()))
+    if names == (VSYS_ALL,):
+        return None
+    return names or (DEFAULT_VSYS,)
+
+
+def rule_xpath(vsys: str, rulebase: str, name: str) -> str:
+    """XPath of one rule, e.g. ``rule_xpath("vsys1", "security", "allow-dns")``."""
+    return f"{XPATH_VSYS.format(vsys=vsys)}/rulebase/{rulebase}/rules/entry[@name={xpath_literal(name)}]"
+
+
+def xpath_literal(value: str) -> str:
+    """``value`` as an XPath 1.0 string literal; rule names may contain quotes."""
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
+class _ApiKey:
+    """API key cache shared by a client and its ``for_target`` copies."""
+
+    __slots__ = ("key", "lock")
+
+    def __init__(self):
+        self.key = None
+        self.lock = asyncio.Lock()
+
+
+class PanOsClient:
+    """XML API client for one firewall (or Panorama).
+
+    Requests go through Home Assistant's shared aiohttp session, whose
+    connector keeps keep-alive connections pooled per host, so TLS is only
+    negotiated when a new connection is opened. The API key is generated
+    once and reused until the firewall rejects it.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, host: str, port: int, username: str, password: str):
+        self.hostname = host
+        self.target = None
+        self._session = session
+        self._url = f"https://{host}:{port}/api/"
+        self._username = username
+        self._password = password
+        self._auth = _ApiKey()
+
+    def for_target(self, serial: str) -> "PanOsClient":
+        """Client for a firewall managed by this Panorama.
+
+        Every authenticated request carries ``target=<serial>`` and is
+        proxied by Panorama; the connection pool and API key are shared.
+        """
+        client = copy.copy(self)
+        client.target = serial
+        return client
+
+    async def async_keygen(self) -> str:
+        """Return the cached API key, generating it on first use."""
+        auth = self._auth
+        async with auth.lock:
+            if auth.key is None:
+                root = await self._async_post(
+                    {"type": "keygen", "user": self._username, "password": self._password}
+                )
+                key = root.findtext("./result/key")
+                if not key:
+                    raise PanOsAuthError("Firewall did not return an API key")
+                auth.key = key
+            return auth.key
+
+    async def async_request(self, params: dict) -> ET.Element:
+        """Send an authenticated request and return the ``<response>`` element."""
+        key = await self.async_keygen()
+        try:
+            return await self._async_post(params, key)
+        except PanOsAuthError:
+            # The key was revoked or expired: fetch a new one and retry once.
+            if self._auth.key == key:
+                self._auth.key = None
+            return await self._async_post(params, await self.async_keygen())
+
+    async def async_op(self, cmd: str) -> ET.Element:
+        return await self.async_request({"type": "op", "cmd": cmd_xml(cmd)})
+
+    async def async_get_config(self, xpath: str) -> ET.Element:
+        """Candidate config at ``xpath``."""
+        return await self.async_request({"type": "config", "action": "get", "xpath": xpath})
+
+    async def async_show_config(self, xpath: str) -> ET.Element:
+        """Running config at ``xpath``."""
+        return await self.async_request({"type": "config", "action": "show", "xpath": xpath})
+
+    async def async_show_config_events(self, xpath: str, events=("start", "end")):
+        """Stream the running config at ``xpath`` as ``(event, element)`` pairs.
+
+        The response is fed to an incremental parser chunk by chunk as it
+        arrives, so the caller can process and drop elements without the
+        whole document ever being held as one tree.
+        """
+        params = {"type": "config", "action": "show", "xpath": xpath}
+        async for item in self.async_iter_events(params, events):
+            yield item
+
+    async def async_op_events(self, cmd: str, events=("start", "end")):
+        """Stream an op command's response as ``(event, element)`` pairs."""
+        async for item in self.async_iter_events({"type": "op", "cmd": cmd_xml(cmd)}, events):
+            yield item
+
+    async def async_iter_events(self, params: dict, events=("start", "end")):
+        """Stream any request's response through ``ET.XMLPullParser``."""
+        key = await self.async_keygen()
+        try:
+            async for item in self._async_stream(params, key, events):
+                yield item
+        except _StreamAuthError:
+            # Raised before anything was yielded, so a retry is safe.
+            if self._auth.key == key:
+                self._auth.key = None
+            async for item in self._async_stream(params, await self.async_keygen(), events):
+                yield item
+
+    async def async_set_config(self, xpath: str, element: str) -> ET.Element:
+        return await self.async_request(
+            {"type": "config", "action": "set", "xpath": xpath, "element": element}
+        )
+
+    async def async_multi_config(self, operations: list[tuple[str, str, str]]) -> ET.Element:
+        """Apply several ``(action, xpath, element)`` edits in one request."""
+        body = "".join(
+            f'<{action} id="{i}" xpath={quoteattr(xpath)}>{element}</{action}>'
+            for i, (action, xpath, element) in enumerate(operations, 1)
+        )
+        return await self.async_request(
+            {
+                "type": "config",
+                "action": "multi-config",
+                "element": f"<multi-configure-request>{body}</multi-configure-request>",
+            }
+        )
+
+    async def async_commit(self) -> str | None:
+        """Start a commit and return its job id (None if there was nothing to commit)."""
+        root = await self.async_request({"type": "commit", "cmd": "<commit></commit>"})
+        return root.findtext("./result/job")
+
+    async def async_job_status(self, job_id: str) -> ET.Element:
+        root = await self.async_op(f"<show><jobs><id>{job_id}</id></jobs></show>")
+        job = root.find("./result/job")
+        if job is None:
+            raise PanOsApiError(f"Job {job_id} not found")
+        return job
+
+    async def async_wait_for_job(self, job_id: str) -> ET.Element:
+        """Poll a job until it finishes; raise if it did not succeed."""
+        while True:
+            job = await self.async_job_status(job_id)
+            if job.findtext("status") == "FIN":
+                if job.findtext("result") != "OK":
+                    details = " ".join(
+                        line.text.strip() for line in job.iterfind("./details/line") if line.text
+                    )
+                    raise PanOsApiError(f"Job {job_id} failed: {details or job.findtext('result')}")
+                return job
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    def _target_params(self, params: dict) -> dict:
+        return params if self.target is None else {**params, "target": self.target}
+
+    async def _async_post(self, params: dict, key: str | None = None) -> ET.Element:
+        headers = None
+        if key:
+            headers = {"X-PAN-KEY": key}
+            params = self._target_params(params)
+        try:
+            async with self._session.post(self._url, data=params, headers=headers) as resp:
+                if resp.status == 403:
+                    raise PanOsAuthError("Invalid credentials")
+                body = await resp.read()
+        except aiohttp.ClientError as err:
+            raise PanOsApiError(f"Request to {self.hostname} failed: {err}") from err
+        stats = REQUEST_STATS.get()
+        if stats is None:
+            return _parse_response(body)
+        start = time.perf_counter()
+        try:
+            return _parse_response(body)
+        finally:
+            stats.add_response(len(body), time.perf_counter() - start)
+
+    async def _async_stream(self, params: dict, key: str, events):
+        parser = ET.XMLPullParser(events)
+        root = None
+        stats = REQUEST_STATS.get()
+        params = self._target_params(params)
+        try:
+            async with self._session.post(self._url, data=params, headers={"X-PAN-KEY": key}) as resp:
+                if resp.status == 403:
+                    raise _StreamAuthError("Invalid credentials")
+                async for chunk in resp.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    if stats is None:
+                        parser.feed(chunk)
+                    else:
+                        start = time.perf_counter()
+                        parser.feed(chunk)
+                        stats.add_response(len(chunk), time.perf_counter() - start)
+                    for event, elem in parser.read_events():
+                        if root is None:
+                            root = elem
+                        if root.get("status") == "success":
+                            yield event, elem
+                    # iter_chunked does not yield to the loop while data is
+                    # buffered; a large table would hold it for seconds.
+                    await asyncio.sleep(0)
+            parser.close()
+        except aiohttp.ClientError as err:
+            raise PanOsApiError(f"Request to {self.hostname} failed: {err}") from err
+        except ET.ParseError as err:
+            raise PanOsApiError(f"Invalid XML in response: {err}") from err
+
+        if root is None:
+            raise PanOsApiError("Empty response")
+        if root.get("status") != "success":
+            # Nothing was yielded, the whole (small) error document is in root.
+            try:
+                _raise_for_status(root)
+            except PanOsAuthError as err:
+                raise _StreamAuthError(str(err)) from err
+
+
+class _StreamAuthError(PanOsAuthError):
+    """Auth failure detected before a stream yielded anything."""
+
+
+def _parse_response(body: bytes) -> ET.Element:
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError as err:
+        raise PanOsApiError(f"Invalid XML in response: {err}") from err
+
+    _raise_for_status(root)
+    return root
+
+
+def _raise_for_status(root: ET.Element) -> None:
+    if root.get("status") != "success":
+        msg = " ".join(t.strip() for t in root.itertext() if t.strip()) or "unknown error"
+        if root.get("code") in ("403", "16"):
+            raise PanOsAuthError(msg)
+        raise PanOsApiError(msg)
@@ -12,7 +12,14 @@ from .const import DOMAIN
 async def async_setup_entry(
     hass: HomeAssistant, entry, async_add_entities: AddEntitiesCallback
 ):
-    data = hass.data[DOMAIN][entry.entry_id]
+    entities = []
+    for data in hass.data[DOMAIN][entry.entry_id]["devices"]:
+        entities.extend(_device_entities(data))
+    async_add_entities(entities)
+
+
+def _device_entities(data: dict) -> list:
+    """Entities of one firewall (fleet entries have several)."""
     coordinator = data["coordinator"]
     serial = data["serial"]
     hostname = data["hostname"]
@@ -30,14 +37,14 @@ async def async_setup_entry(
         )
     ]
 
-    async_add_entities(entities, update_before_add=True)
+    return entities
 
 
 class PanFirewallCommitPendingSensor(CoordinatorEntity, BinarySensorEntity):
     """Binary sensor showing if a commit is pending."""
 
     def __init__(self, coordinator, serial, hostname, model, version, fw):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=frozenset({"commit_pending"}))
         self._serial = serial
         self._hostname = hostname
         self._model = model
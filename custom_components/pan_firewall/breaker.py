@@ -0,0 +1,45 @@
+"""Circuit breaker for PAN Firewall poll commands."""
+
+FAILURE_THRESHOLD = 3
+BASE_COOLDOWN = 60
+MAX_COOLDOWN = 900
+
+
+class CircuitBreaker:
+    """Stop calling a command that keeps failing.
+
+    After ``FAILURE_THRESHOLD`` consecutive failures the breaker opens and
+    the command is skipped for a cooldown. When the cooldown is over one
+    call is let through; if it fails too, the breaker reopens with twice
+    the cooldown (up to ``MAX_COOLDOWN``). Any success closes it.
+    """
+
+    __slots__ = ("failures", "open_until", "_cooldown")
+
+    def __init__(self):
+        self.failures = 0
+        self.open_until = None
+        self._cooldown = BASE_COOLDOWN
+
+    def allow(self, now: float) -> bool:
+        return self.open_until is None or now >= self.open_until
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.open_until = None
+        self._cooldown = BASE_COOLDOWN
+
+    def record_failure(self, now: float) -> bool:
+        """Count a failure; True when this failure opened the breaker."""
+        self.failures += 1
+        if self.failures < FAILURE_THRESHOLD:
+            return False
+        if self.open_until is not None:
+            # The trial call after a cooldown failed as well.
+            self._cooldown = min(self._cooldown * 2, MAX_COOLDOWN)
+        self.open_until = now + self._cooldown
+        return True
+
+    @property
+    def cooldown(self) -> int:
+        return self._cooldown
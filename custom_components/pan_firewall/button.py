@@ -12,7 +12,14 @@ from .const import DOMAIN
 async def async_setup_entry(
     hass: HomeAssistant, entry, async_add_entities: AddEntitiesCallback
 ):
-    data = hass.data[DOMAIN][entry.entry_id]
+    entities = []
+    for data in hass.data[DOMAIN][entry.entry_id]["devices"]:
+        entities.extend(_device_entities(data))
+    async_add_entities(entities)
+
+
+def _device_entities(data: dict) -> list:
+    """Entities of one firewall (fleet entries have several)."""
     coordinator = data["coordinator"]
     serial = data["serial"]
     hostname = data["hostname"]
@@ -22,6 +29,7 @@ async def async_setup_entry(
     entities = [
         PanFirewallCommitButton(
             coordinator=coordinator,
+            commit_scheduler=data["commit_scheduler"],
             serial=serial,
             hostname=hostname,
             model=model,
@@ -30,14 +38,16 @@ async def async_setup_entry(
         )
     ]
 
-    async_add_entities(entities, update_before_add=True)
+    return entities
 
 
 class PanFirewallCommitButton(CoordinatorEntity, ButtonEntity):
     """Button to trigger a manual commit."""
 
-    def __init__(self, coordinator, serial, hostname, model, version, fw):
-        super().__init__(coordinator)
+    def __init__(self, coordinator, commit_scheduler, serial, hostname, model, version, fw):
+        # The button shows no coordinator data; it only needs availability updates.
+        super().__init__(coordinator, context=frozenset())
+        self._commit_scheduler = commit_scheduler
         self._serial = serial
         self._hostname = hostname
         self._model = model
@@ -61,10 +71,5 @@ class PanFirewallCommitButton(CoordinatorEntity, ButtonEntity):
         )
 
     async def async_press(self) -> None:
-        """Execute commit when button is pressed."""
-        def do_commit():
-            self._fw.commit(sync=True)
-            return True
-
-        await self.hass.async_add_executor_job(do_commit)
-        await self.coordinator.async_request_refresh()  # Refresh all sensors
+        """Start a commit now; any queued rule changes go with it."""
+        self._commit_scheduler.async_commit_now()
@@ -0,0 +1,147 @@
+"""Coalesced commits for PAN Firewall."""
+
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .api import PanOsClient
+
+_LOGGER = logging.getLogger(__name__)
+
+COMMIT_IDLE = "idle"
+COMMIT_QUEUED = "queued"
+COMMIT_RUNNING = "running"
+COMMIT_FINISHED = "finished"
+COMMIT_FAILED = "failed"
+
+
+class CommitScheduler:
+    """Batch config changes on one firewall into a single commit.
+
+    The first change opens a window of ``delay`` seconds; every change made
+    before it closes rides along in the same commit. The commit itself is a
+    submitted job that is polled until it finishes, so nothing blocks while
+    the firewall works. Changes that arrive while a commit is running are
+    committed in a follow-up commit.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: PanOsClient, delay: float, on_committed):
+        self.hass = hass
+        self._client = client
+        self._delay = delay
+        self._on_committed = on_committed
+        self.state = COMMIT_IDLE
+        self.job_id = None
+        self.last_error = None
+        self.pending_changes = 0
+        self._unsub_timer = None
+        self._task = None
+        self._rerun = False
+        self._listeners = []
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_request_commit(self) -> None:
+        """Queue a commit for a change that was just pushed."""
+        self.pending_changes += 1
+        if self._task is not None:
+            self._rerun = True
+            self._notify()
+        else:
+            self._schedule()
+
+    @callback
+    def async_commit_now(self, changes: int = 0) -> None:
+        """Commit without waiting for the batching window.
+
+        ``changes`` counts changes pushed together with the request (a bulk
+        update); Commit Now on its own has none.
+        """
+        self.pending_changes += changes
+        if self._task is not None:
+            self._rerun = True
+            self._notify()
+            return
+        self._cancel_timer()
+        self._start()
+
+    @callback
+    def async_shutdown(self) -> None:
+        self._cancel_timer()
+        if self._task is not None:
+            self._task.cancel()
+
+    @callback
+    def _async_timer_fired(self, _now) -> None:
+        self._unsub_timer = None
+        self._start()
+
+    @callback
+    def _start(self) -> None:
+        self._task = self.hass.async_create_background_task(
+            self._async_commit(), "pan_firewall commit"
+        )
+
+    async def _async_commit(self) -> None:
+        batched = self.pending_changes
+        self.pending_changes = 0
+        self._rerun = False
+        self.job_id = None
+        self._set_state(COMMIT_RUNNING)
+
+        try:
+            self.job_id = await self._client.async_commit()
+            self._notify()
+            if self.job_id is not None:
+                await self._client.async_wait_for_job(self.job_id)
+        except Exception as err:
+            _LOGGER.error("Commit of %s change(s) failed: %s", batched, err)
+            self.last_error = str(err)
+            self._set_state(COMMIT_FAILED)
+        else:
+            _LOGGER.debug("Committed %s change(s) (job %s)", batched, self.job_id)
+            self.last_error = None
+            self._set_state(COMMIT_FINISHED)
+        finally:
+            self._task = None
+
+        try:
+            await self._on_committed()
+        except Exception:
+            _LOGGER.exception("Refresh after commit failed")
+        finally:
+            # Changes made while the commit ran must not be stranded.
+            if self._rerun:
+                self._schedule()
+
+    @callback
+    def _schedule(self) -> None:
+        if self._unsub_timer is None:
+            self._unsub_timer = async_call_later(self.hass, self._delay, self._async_timer_fired)
+        self._set_state(COMMIT_QUEUED)
+
+    @callback
+    def _cancel_timer(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    @callback
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        self._notify()
+
+    @callback
+    def _notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
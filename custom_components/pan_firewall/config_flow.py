@@ -4,11 +4,12 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-import panos.firewall
+from .api import PanOsClient, XPATH_VSYS, parse_vsys
 from .const import (
     DOMAIN,
     CONF_VSYS,
@@ -16,14 +17,71 @@ from .const import (
     DEFAULT_PORT,
     CONF_VERIFY_SSL,
     DEFAULT_VERIFY_SSL,
+    CONF_DEVICE_TYPE,
+    DEVICE_TYPE_FIREWALL,
+    DEVICE_TYPE_PANORAMA,
     CONF_SCAN_INTERVAL,
     DEFAULT_SCAN_INTERVAL,
     MIN_SCAN_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    CONF_MAX_CONCURRENCY,
+    DEFAULT_MAX_CONCURRENCY,
+    MAX_MAX_CONCURRENCY,
+    CONF_SLOW_SCAN_INTERVAL,
+    DEFAULT_SLOW_SCAN_INTERVAL,
+    CONF_STATIC_SCAN_INTERVAL,
+    DEFAULT_STATIC_SCAN_INTERVAL,
+    CONF_COMMIT_DELAY,
+    DEFAULT_COMMIT_DELAY,
+    MAX_COMMIT_DELAY,
+    CONF_UNUSED_RULE_DAYS,
+    DEFAULT_UNUSED_RULE_DAYS,
 )
 
+
+def _settings_schema(defaults: dict) -> dict:
+    """Polling, concurrency, commit and reporting fields shared by the user and options steps."""
+    return {
+        vol.Optional(
+            CONF_SCAN_INTERVAL,
+            default=defaults.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+        ): vol.All(vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL)),
+        vol.Optional(
+            CONF_MAX_SCAN_INTERVAL,
+            default=defaults.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+        ): vol.All(vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL)),
+        vol.Optional(
+            CONF_SLOW_SCAN_INTERVAL,
+            default=defaults.get(CONF_SLOW_SCAN_INTERVAL, DEFAULT_SLOW_SCAN_INTERVAL),
+        ): vol.All(vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL)),
+        vol.Optional(
+            CONF_STATIC_SCAN_INTERVAL,
+            default=defaults.get(CONF_STATIC_SCAN_INTERVAL, DEFAULT_STATIC_SCAN_INTERVAL),
+        ): vol.All(vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL)),
+        vol.Optional(
+            CONF_MAX_CONCURRENCY,
+            default=defaults.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+        ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_MAX_CONCURRENCY)),
+        vol.Optional(
+            CONF_COMMIT_DELAY,
+            default=defaults.get(CONF_COMMIT_DELAY, DEFAULT_COMMIT_DELAY),
+        ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_COMMIT_DELAY)),
+        vol.Optional(
+            CONF_UNUSED_RULE_DAYS,
+            default=defaults.get(CONF_UNUSED_RULE_DAYS, DEFAULT_UNUSED_RULE_DAYS),
+        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+
+
 class PanFirewallConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return PanFirewallOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict | None = None
     ) -> FlowResult:
@@ -39,22 +97,24 @@ class PanFirewallConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             else:
                 await self.async_set_unique_id(user_input[CONF_HOST])
                 self._abort_if_unique_id_configured()
+                kind = "Panorama" if user_input.get(CONF_DEVICE_TYPE) == DEVICE_TYPE_PANORAMA else "PAN Firewall"
                 return self.async_create_entry(
-                    title=f"PAN Firewall {user_input[CONF_HOST]}",
+                    title=f"{kind} {user_input[CONF_HOST]}",
                     data=user_input,
                 )
 
         data_schema = vol.Schema(
             {
+                vol.Optional(CONF_DEVICE_TYPE, default=DEVICE_TYPE_FIREWALL): vol.In(
+                    [DEVICE_TYPE_FIREWALL, DEVICE_TYPE_PANORAMA]
+                ),
                 vol.Required(CONF_HOST): str,
                 vol.Optional(CONF_PORT, default=DEFAULT_PORT): int,
                 vol.Required(CONF_USERNAME): str,
                 vol.Required(CONF_PASSWORD): str,
                 vol.Optional(CONF_VSYS, default=DEFAULT_VSYS): str,
                 vol.Optional(CONF_VERIFY_SSL, default=DEFAULT_VERIFY_SSL): bool,
-                vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): vol.All(
-                    vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL)
-                ),
+                **_settings_schema({}),
             }
         )
 
@@ -63,23 +123,38 @@ class PanFirewallConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
     async def _validate_connection(self, data: dict):
-        def test_connection():
-            fw = panos.firewall.Firewall(
-                hostname=data[CONF_HOST],
-                api_username=data[CONF_USERNAME],
-                api_password=data[CONF_PASSWORD],
-                port=data.get(CONF_PORT, DEFAULT_PORT),
-                verify=data.get(CONF_VERIFY_SSL, DEFAULT_VERIFY_SSL),
-            )
-            rulebase = fw.add(panos.policies.Rulebase())
-            panos.policies.SecurityRule.refreshall(rulebase)
-            return fw
+        fw = PanOsClient(
+            async_get_clientsession(self.hass, verify_ssl=data.get(CONF_VERIFY_SSL, DEFAULT_VERIFY_SSL)),
+            host=data[CONF_HOST],
+            port=data.get(CONF_PORT, DEFAULT_PORT),
+            username=data[CONF_USERNAME],
+            password=data[CONF_PASSWORD],
+        )
+        # With several vsys (or "all") the first one is checked.
+        vsys = (parse_vsys(data.get(CONF_VSYS, DEFAULT_VSYS)) or (DEFAULT_VSYS,))[0]
+        vsys_xpath = XPATH_VSYS.format(vsys=vsys)
 
         try:
-            await self.hass.async_add_executor_job(test_connection)
+            if data.get(CONF_DEVICE_TYPE) == DEVICE_TYPE_PANORAMA:
+                await fw.async_op("show devices connected")
+            else:
+                await fw.async_get_config(f"{vsys_xpath}/rulebase/security/rules")
         except Exception as err:
             raise CannotConnect from err
 
 
+class PanFirewallOptionsFlow(config_entries.OptionsFlow):
+    """Adjust polling and commit settings without re-entering credentials."""
+
+    async def async_step_init(self, user_input: dict | None = None) -> FlowResult:
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        defaults = {**self.config_entry.data, **self.config_entry.options}
+        return self.async_show_form(
+            step_id="init", data_schema=vol.Schema(_settings_schema(defaults))
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
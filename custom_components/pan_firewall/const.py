@@ -8,10 +8,44 @@ CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_VSYS = "vsys"
 CONF_VERIFY_SSL = "verify_ssl"
+CONF_DEVICE_TYPE = "device_type"
 CONF_SCAN_INTERVAL = "scan_interval"          # ← NEW
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_SLOW_SCAN_INTERVAL = "slow_scan_interval"
+CONF_STATIC_SCAN_INTERVAL = "static_scan_interval"
+CONF_COMMIT_DELAY = "commit_delay"
+CONF_UNUSED_RULE_DAYS = "unused_rule_days"
 
 DEFAULT_PORT = 443
 DEFAULT_VSYS = "vsys1"
+VSYS_ALL = "all"              # poll every vsys the firewall has
 DEFAULT_VERIFY_SSL = True
+DEVICE_TYPE_FIREWALL = "firewall"
+DEVICE_TYPE_PANORAMA = "panorama"     # fleet mode: every firewall managed by Panorama
 DEFAULT_SCAN_INTERVAL = 30
 MIN_SCAN_INTERVAL = 10
+DEFAULT_MAX_SCAN_INTERVAL = 300
+DEFAULT_MAX_CONCURRENCY = 4
+MAX_MAX_CONCURRENCY = 16
+DEFAULT_SLOW_SCAN_INTERVAL = 300
+DEFAULT_STATIC_SCAN_INTERVAL = 3600
+DEFAULT_COMMIT_DELAY = 5
+MAX_COMMIT_DELAY = 300
+DEFAULT_UNUSED_RULE_DAYS = 30
+
+# Polling tiers: each data group is fetched on its own interval.
+# CONF_SCAN_INTERVAL drives the fast tier (and the coordinator tick).
+TIER_FAST = "fast"        # sessions, CPU, commit pending
+TIER_SLOW = "slow"        # rulebases, routing table
+TIER_STATIC = "static"    # show system info (versions, serial, ...)
+
+# In-memory history of fast metrics (see stats.RingBuffer)
+HISTORY_SIZE = 360        # samples kept per metric
+HISTORY_WINDOW = 300      # seconds covered by the min/max/avg/p95 attributes
+
+# Domain-wide poll scheduler (see scheduler.PollScheduler), shared by all entries
+GLOBAL_MAX_CONCURRENCY = 8    # poll commands in flight across every firewall
+GLOBAL_RATE_LIMIT = 5         # poll commands started per second, sustained
+GLOBAL_BURST = 20             # ... and in a burst
+MAX_STAGGER = 5               # max seconds between two background poll starts
@@ -0,0 +1,40 @@
+"""Diagnostics support for PAN Firewall."""
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME, DOMAIN
+from .scheduler import async_get_scheduler
+
+TO_REDACT = {
+    CONF_HOST,
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    "serial",
+    "hostname",
+    "ip_address",
+    "mac_address",
+    "title",
+    "unique_id",
+}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "devices": [_device_diagnostics(data) for data in hass.data[DOMAIN][entry.entry_id]["devices"]],
+        "scheduler": async_get_scheduler(hass).diagnostics(),
+    }
+
+
+def _device_diagnostics(data: dict) -> dict:
+    commit_scheduler = data["commit_scheduler"]
+    return {
+        "coordinator": async_redact_data(data["coordinator"].diagnostics(), TO_REDACT),
+        "commit": {
+            "state": commit_scheduler.state,
+            "pending_changes": commit_scheduler.pending_changes,
+            "last_error": commit_scheduler.last_error,
+        },
+    }
@@ -0,0 +1,257 @@
+"""Address and service objects for PAN Firewall."""
+
+import ipaddress
+import logging
+import re
+
+from .api import XPATH_VSYS
+
+_LOGGER = logging.getLogger(__name__)
+
+OBJECT_KINDS = ("address", "address-group", "service", "service-group")
+
+# Services PAN-OS ships with; they are not part of the config.
+PREDEFINED_SERVICES = {
+    "service-http": (("tcp", 80, 80), ("tcp", 8080, 8080)),
+    "service-https": (("tcp", 443, 443),),
+}
+
+
+def objects_xpath(vsys: str) -> str:
+    """Shared and vsys address/service objects, as one union xpath.
+
+    Shared objects come first in the config, so when a vsys object has the
+    same name as a shared one the later (vsys) entry wins.
+    """
+    vsys_xpath = XPATH_VSYS.format(vsys=vsys)
+    return "|".join(
+        f"{base}/{kind}" for base in ("/config/shared", vsys_xpath) for kind in OBJECT_KINDS
+    )
+
+
+def parse_network(value: str) -> list:
+    """ip-netmask / ip-range / bare IP text → list of ``ip_network``."""
+    value = value.strip()
+    try:
+        if "-" in value:
+            first, last = (ipaddress.ip_address(v.strip()) for v in value.split("-", 1))
+            return list(ipaddress.summarize_address_range(first, last))
+        return [ipaddress.ip_network(value, strict=False)]
+    except ValueError:
+        return []
+
+
+def parse_ports(text: str | None) -> list[tuple[int, int]]:
+    """``"80,8000-8080"`` → ``[(80, 80), (8000, 8080)]``."""
+    ports = []
+    for part in (text or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        low, _, high = part.partition("-")
+        try:
+            ports.append((int(low), int(high or low)))
+        except ValueError:
+            continue
+    return ports
+
+
+_FILTER_TOKEN = re.compile(r"""\s*(?:(\()|(\))|'([^']*)'|"([^"]*)"|([^\s()]+))""")
+
+
+def compile_tag_filter(expr: str):
+    """Compile a dynamic address group filter into a ``tags → bool`` test.
+
+    Supports quoted or bare tag names combined with ``and``, ``or`` and
+    parentheses, e.g. ``'web' and ('prod' or 'dmz')``.
+    """
+    tokens = []
+    pos = 0
+    expr = expr.strip()
+    while pos < len(expr):
+        match = _FILTER_TOKEN.match(expr, pos)
+        if match is None:
+            raise ValueError(f"Bad filter near {expr[pos:]!r}")
+        pos = match.end()
+        lparen, rparen, single, double, bare = match.groups()
+        if lparen or rparen:
+            tokens.append(lparen or rparen)
+        elif bare is not None and bare.lower() in ("and", "or"):
+            tokens.append(bare.lower())
+        else:
+            tokens.append(("tag", single if single is not None else double if double is not None else bare))
+
+    def parse_or(i):
+        left, i = parse_and(i)
+        while i < len(tokens) and tokens[i] == "or":
+            right, i = parse_and(i + 1)
+            left = (lambda a, b: lambda tags: a(tags) or b(tags))(left, right)
+        return left, i
+
+    def parse_and(i):
+        left, i = parse_atom(i)
+        while i < len(tokens) and tokens[i] == "and":
+            right, i = parse_atom(i + 1)
+            left = (lambda a, b: lambda tags: a(tags) and b(tags))(left, right)
+        return left, i
+
+    def parse_atom(i):
+        if i >= len(tokens):
+            raise ValueError("Unexpected end of filter")
+        token = tokens[i]
+        if token == "(":
+            inner, i = parse_or(i + 1)
+            if i >= len(tokens) or tokens[i] != ")":
+                raise ValueError("Missing ')' in filter")
+            return inner, i + 1
+        if isinstance(token, tuple):
+            return (lambda tag: lambda tags: tag in tags)(token[1]), i + 1
+        raise ValueError(f"Unexpected {token!r} in filter")
+
+    test, end = parse_or(0)
+    if end != len(tokens):
+        raise ValueError(f"Unexpected {tokens[end]!r} in filter")
+    return test
+
+
+class AddressBook:
+    """Address and service objects of one vsys, merged with shared ones.
+
+    ``resolve_address`` and ``resolve_service`` expand group members down
+    to networks and ``(protocol, low port, high port)`` tuples. Names that
+    are not objects are tried as literal IPs, networks or ranges; anything
+    else (FQDN objects, EDLs, regions) resolves to nothing. Dynamic groups
+    match address objects by tag; IPs registered at runtime through
+    User-ID are not in the config and are not included.
+
+    A book is built once per config version, so expansions are memoized
+    on it; reference cycles between groups are logged and cut.
+    """
+
+    def __init__(self):
+        self.addresses = {}        # name → [ip_network, ...]
+        self.address_tags = {}     # name → (tag, ...)
+        self.address_groups = {}   # name → (member, ...)
+        self.dynamic_groups = {}   # name → filter expression
+        self.services = dict(PREDEFINED_SERVICES)
+        self.service_groups = {}   # name → (member, ...)
+        self._address_cache = {}
+        self._service_cache = {}
+
+    def __eq__(self, other):
+        if not isinstance(other, AddressBook):
+            return NotImplemented
+        return (
+            self.addresses == other.addresses
+            and self.address_tags == other.address_tags
+            and self.address_groups == other.address_groups
+            and self.dynamic_groups == other.dynamic_groups
+            and self.services == other.services
+            and self.service_groups == other.service_groups
+        )
+
+    def resolve_address(self, name: str) -> tuple:
+        return self._expand(name, self._address_cache, self._address_members, self._address_leaf, ())
+
+    def resolve_service(self, name: str) -> tuple:
+        return self._expand(name, self._service_cache, self.service_groups.get, self._service_leaf, ())
+
+    def _expand(self, name, cache, members_of, leaf, visiting) -> tuple:
+        return self._expand_partial(name, cache, members_of, leaf, visiting)[0]
+
+    def _expand_partial(self, name, cache, members_of, leaf, visiting) -> tuple[tuple, int]:
+        """Expansion of ``name`` and the depth of the shallowest group cut as a cycle.
+
+        Cutting a cycle at an ancestor leaves every group below it on the
+        path incomplete (in grp1 ↔ grp2 expanded from grp1, grp2 lacks
+        grp1's members), so only expansions that cut nothing above them
+        are memoized.
+        """
+        if name in cache:
+            return cache[name], len(visiting)
+        members = members_of(name)
+        depth = len(visiting)
+        shallowest = depth
+        if members is None:
+            result = leaf(name)
+        elif name in visiting:
+            _LOGGER.warning("Group %s references itself via %s", name, " > ".join(visiting))
+            return (), visiting.index(name)
+        else:
+            visiting = (*visiting, name)
+            result = []
+            for member in members:
+                items, cut = self._expand_partial(member, cache, members_of, leaf, visiting)
+                result.extend(items)
+                shallowest = min(shallowest, cut)
+            result = tuple(result)
+        if shallowest >= depth:
+            cache[name] = result
+        return result, shallowest
+
+    def _address_members(self, name):
+        if name in self.address_groups:
+            return self.address_groups[name]
+        if name in self.dynamic_groups:
+            try:
+                test = compile_tag_filter(self.dynamic_groups[name])
+            except ValueError as err:
+                _LOGGER.warning("Cannot evaluate dynamic group %s: %s", name, err)
+                return ()
+            return tuple(obj for obj, tags in self.address_tags.items() if test(set(tags)))
+        return None
+
+    def _address_leaf(self, name) -> tuple:
+        if name in self.addresses:
+            return tuple(self.addresses[name])
+        return tuple(parse_network(name))
+
+    def _service_leaf(self, name) -> tuple:
+        return tuple(self.services.get(name, ()))
+
+
+class ObjectsCollector:
+    """Fill an ``AddressBook`` from a streamed ``objects_xpath`` response."""
+
+    def __init__(self):
+        self.book = AddressBook()
+        self._stack = []
+
+    def handle(self, event: str, elem) -> None:
+        if event == "start":
+            self._stack.append(elem)
+            return
+
+        self._stack.pop()
+        if elem.tag != "entry" or not self._stack:
+            return
+        parent = self._stack[-1]
+        kind = parent.tag
+        if kind not in OBJECT_KINDS:
+            return
+
+        name = elem.get("name")
+        book = self.book
+        if kind == "address":
+            networks = []
+            for tag in ("ip-netmask", "ip-range"):
+                value = elem.findtext(tag)
+                if value:
+                    networks = parse_network(value)
+            book.addresses[name] = networks
+            book.address_tags[name] = tuple(m.text for m in elem.iterfind("./tag/member") if m.text)
+        elif kind == "address-group":
+            dynamic_filter = elem.findtext("./dynamic/filter")
+            if dynamic_filter is not None:
+                book.dynamic_groups[name] = dynamic_filter
+            else:
+                book.address_groups[name] = tuple(m.text for m in elem.iterfind("./static/member") if m.text)
+        elif kind == "service":
+            book.services[name] = tuple(
+                (proto.tag, low, high)
+                for proto in elem.iterfind("./protocol/*")
+                for low, high in parse_ports(proto.findtext("port"))
+            )
+        else:
+            book.service_groups[name] = tuple(m.text for m in elem.iterfind("./members/member") if m.text)
+        parent.remove(elem)
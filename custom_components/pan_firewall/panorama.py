@@ -0,0 +1,68 @@
+"""Panorama fleet mode for PAN Firewall."""
+
+import asyncio
+import time
+
+from .api import PanOsApiError, PanOsClient
+
+
+def parse_connected_devices(root) -> list[dict]:
+    """``show devices connected`` → one dict of text fields per firewall.
+
+    Keys are the entry's direct children with ``-`` turned into ``_``, the
+    same shape as ``system_info``; ``connected`` becomes a bool.
+    """
+    devices = []
+    for entry in root.iterfind("./result/devices/entry"):
+        fields = {
+            child.tag.replace("-", "_"): child.text.strip()
+            for child in entry
+            if child.text and child.text.strip()
+        }
+        fields.setdefault("serial", entry.get("name"))
+        fields["connected"] = fields.get("connected") == "yes"
+        devices.append(fields)
+    return devices
+
+
+def device_facts(device: dict) -> dict:
+    return {
+        "serial": device["serial"],
+        "hostname": device.get("hostname") or device["serial"],
+        "model": device.get("model"),
+        "version": device.get("sw_version"),
+    }
+
+
+class PanoramaFleet:
+    """The firewalls managed by one Panorama.
+
+    ``show devices connected`` returns hostname, model, software and content
+    versions and uptime of every managed firewall in one response. It is
+    fetched at most once per ``ttl`` and shared by all firewall
+    coordinators of the fleet, so the static tier costs one request for the
+    whole fleet instead of one ``show system info`` per firewall.
+    """
+
+    def __init__(self, client: PanOsClient, ttl: float):
+        self.client = client
+        self._ttl = ttl
+        self._devices = None
+        self._fetched_at = None
+        self._lock = asyncio.Lock()
+
+    async def async_devices(self) -> dict[str, dict]:
+        """serial → device fields, fetched once per ``ttl`` however many ask."""
+        async with self._lock:
+            now = time.monotonic()
+            if self._devices is None or now - self._fetched_at >= self._ttl:
+                root = await self.client.async_op("show devices connected")
+                self._devices = {device["serial"]: device for device in parse_connected_devices(root)}
+                self._fetched_at = now
+            return self._devices
+
+    async def async_system_info(self, serial: str) -> dict:
+        device = (await self.async_devices()).get(serial)
+        if device is None or not device["connected"]:
+            raise PanOsApiError(f"Firewall {serial} is not connected to Panorama")
+        return {key: value for key, value in device.items() if key != "connected"}
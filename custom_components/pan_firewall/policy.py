@@ -0,0 +1,259 @@
+"""Local security policy matching for PAN Firewall.
+
+Rules are numbered by their position in the rulebase and every index maps
+a key (zone, prefix, application, port range) to a bitmask of rule
+positions, held in a Python int. A query ANDs the masks of its fields
+together and the lowest set bit is the first matching rule.
+"""
+
+import ipaddress
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# IP protocol numbers accepted in queries instead of names
+PROTOCOL_NAMES = {"6": "tcp", "17": "udp", "132": "sctp"}
+
+
+class PrefixTrie:
+    """Binary trie over IPv4 and IPv6 prefixes carrying rule bitmasks.
+
+    ``lookup`` ORs the masks of every stored prefix that contains the
+    address, walking at most 32 (or 128) levels.
+    """
+
+    def __init__(self):
+        # node = [mask, child_0, child_1]
+        self._roots = {4: [0, None, None], 6: [0, None, None]}
+
+    def insert(self, network, mask: int) -> None:
+        node = self._roots[network.version]
+        bits = int(network.network_address)
+        width = network.max_prefixlen
+        for i in range(network.prefixlen):
+            bit = (bits >> (width - 1 - i)) & 1
+            if node[1 + bit] is None:
+                node[1 + bit] = [0, None, None]
+            node = node[1 + bit]
+        node[0] |= mask
+
+    def lookup(self, address) -> int:
+        node = self._roots[address.version]
+        bits = int(address)
+        width = address.max_prefixlen
+        result = node[0]
+        for i in range(width):
+            node = node[1 + ((bits >> (width - 1 - i)) & 1)]
+            if node is None:
+                break
+            result |= node[0]
+        return result
+
+
+class _CompiledRule:
+    """A rule with its address and service members resolved."""
+
+    __slots__ = ("sources", "destinations", "services")
+
+    def __init__(self, rule, book):
+        self.sources = _resolve_addresses(rule.sources, book)
+        self.destinations = _resolve_addresses(rule.destinations, book)
+        self.services = _resolve_services(rule.services, book)
+
+
+def _resolve_addresses(members, book):
+    """``None`` for "any", otherwise the list of networks."""
+    if "any" in members:
+        return None
+    return [net for member in members for net in book.resolve_address(member)]
+
+
+def _resolve_services(members, book):
+    """``None`` for "any"/"application-default", otherwise port ranges."""
+    if "any" in members or "application-default" in members:
+        # The default ports of each application are not in the config, so
+        # application-default is treated as matching any port.
+        return None
+    return [svc for member in members for svc in book.resolve_service(member)]
+
+
+class _MaskIndex:
+    """key → bitmask, plus the mask of rules that match any key."""
+
+    __slots__ = ("by_key", "any")
+
+    def __init__(self):
+        self.by_key = {}
+        self.any = 0
+
+    def add(self, members, bit: int) -> None:
+        if "any" in members:
+            self.any |= bit
+            return
+        for member in members:
+            self.by_key[member] = self.by_key.get(member, 0) | bit
+
+    def get(self, key) -> int:
+        return self.any | self.by_key.get(key, 0)
+
+
+class PolicyIndex:
+    """Indexes of one rulebase for first-match lookups."""
+
+    def __init__(self, rules: list, compiled: dict):
+        self.names = [rule.name for rule in rules]
+        self.actions = [rule.action for rule in rules]
+        self.enabled = 0
+        self.from_zones = _MaskIndex()
+        self.to_zones = _MaskIndex()
+        self.applications = _MaskIndex()
+        self.src_any = self.dst_any = 0
+        self.src_negate = self.dst_negate = 0
+        self.src_trie = PrefixTrie()
+        self.dst_trie = PrefixTrie()
+        self.service_any = 0
+        self.service_ranges = {}   # protocol → [(low, high, mask), ...]
+
+        for position, rule in enumerate(rules):
+            bit = 1 << position
+            if not rule.disabled:
+                self.enabled |= bit
+            self.from_zones.add(rule.from_zones, bit)
+            self.to_zones.add(rule.to_zones, bit)
+            self.applications.add(rule.applications, bit)
+
+            entry = compiled[rule]
+            if entry.sources is None:
+                self.src_any |= bit
+            else:
+                for net in entry.sources:
+                    self.src_trie.insert(net, bit)
+            if rule.negate_source:
+                self.src_negate |= bit
+
+            if entry.destinations is None:
+                self.dst_any |= bit
+            else:
+                for net in entry.destinations:
+                    self.dst_trie.insert(net, bit)
+            if rule.negate_destination:
+                self.dst_negate |= bit
+
+            if entry.services is None:
+                self.service_any |= bit
+            else:
+                for protocol, low, high in entry.services:
+                    self.service_ranges.setdefault(protocol, []).append((low, high, bit))
+
+    def _address_mask(self, trie, any_mask, negate_mask, address) -> int:
+        hits = trie.lookup(address) | any_mask
+        # Negated rules match every address that is NOT in their list.
+        return (hits & ~negate_mask) | (negate_mask & ~hits)
+
+    def _service_mask(self, protocol: str, port: int | None) -> int:
+        mask = self.service_any
+        if port is not None:
+            for low, high, bit in self.service_ranges.get(protocol, ()):
+                if low <= port <= high:
+                    mask |= bit
+        return mask
+
+    def match(self, from_zone, to_zone, source, destination, protocol, port, application=None) -> int | None:
+        """Position of the first enabled rule matching the query, or None."""
+        candidates = (
+            self.enabled
+            & self.from_zones.get(from_zone)
+            & self.to_zones.get(to_zone)
+            & self._address_mask(self.src_trie, self.src_any, self.src_negate, source)
+            & self._address_mask(self.dst_trie, self.dst_any, self.dst_negate, destination)
+            & self._service_mask(protocol, port)
+        )
+        if application is not None:
+            candidates &= self.applications.get(application)
+        if not candidates:
+            return None
+        return (candidates & -candidates).bit_length() - 1
+
+    def names_of(self, mask: int) -> list[str]:
+        """Rule names for the set bits of ``mask``, in rulebase order."""
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.names[low.bit_length() - 1])
+            mask ^= low
+        return names
+
+    def referencing(self, address, include_any: bool = False) -> dict:
+        """Rules whose source or destination list covers ``address``."""
+        sources = self.src_trie.lookup(address)
+        destinations = self.dst_trie.lookup(address)
+        if include_any:
+            sources |= self.src_any
+            destinations |= self.dst_any
+        return {"source": self.names_of(sources), "destination": self.names_of(destinations)}
+
+
+class PolicyEngine:
+    """Answer "which rule would match?" from the cached rulebase.
+
+    The index is rebuilt lazily on the first query after the rulebase or
+    the address book changed, i.e. only after a config change. Resolved
+    members are cached per rule snapshot, so a rebuild only resolves rules
+    that actually changed.
+    """
+
+    def __init__(self):
+        self._rules = None
+        self._book = None
+        self._compiled = {}
+        self._index = None
+
+    def _ensure_index(self, rules: dict, book) -> PolicyIndex:
+        if rules is self._rules and book is self._book and self._index is not None:
+            return self._index
+
+        if book is not self._book and book != self._book:
+            # Objects changed: every resolved member may be stale.
+            self._compiled = {}
+        ordered = list(rules.values())
+        compiled = {}
+        for rule in ordered:
+            entry = self._compiled.get(rule)
+            if entry is None:
+                entry = _CompiledRule(rule, book)
+            compiled[rule] = entry
+        self._compiled = compiled
+        self._rules = rules
+        self._book = book
+        self._index = PolicyIndex(ordered, compiled)
+        _LOGGER.debug("Rebuilt policy index for %s rules", len(ordered))
+        return self._index
+
+    def match(self, rules: dict, book, from_zone: str, to_zone: str, source: str, destination: str,
+              protocol: str, port: int | None = None, application: str | None = None) -> dict:
+        index = self._ensure_index(rules, book)
+        position = index.match(
+            from_zone,
+            to_zone,
+            ipaddress.ip_address(source),
+            ipaddress.ip_address(destination),
+            PROTOCOL_NAMES.get(str(protocol), str(protocol).lower()),
+            port,
+            application,
+        )
+        if position is not None:
+            return {"rule": index.names[position], "action": index.actions[position], "position": position}
+        # Nothing matched: PAN-OS default rules.
+        if from_zone == to_zone:
+            return {"rule": "intrazone-default", "action": "allow", "position": None}
+        return {"rule": "interzone-default", "action": "deny", "position": None}
+
+    def rules_for_address(self, rules: dict, book, address: str, include_any: bool = False) -> dict:
+        """Rules that reference ``address`` in their source or destination.
+
+        Uses the same prefix tries as ``match``, so it is a walk of at most
+        128 levels per side instead of a scan of every rule. Negated
+        references count; rules with "any" only when ``include_any`` is set.
+        """
+        index = self._ensure_index(rules, book)
+        return index.referencing(ipaddress.ip_address(address), include_any)
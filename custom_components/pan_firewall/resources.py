@@ -0,0 +1,59 @@
+"""Dataplane resource-monitor parsing for PAN Firewall."""
+
+from array import array
+
+from .stats import percentile
+
+# resource-utilization entry name → data key
+RESOURCE_KEYS = {
+    "packet buffer": "packet_buffer",
+    "packet descriptor": "packet_descriptor",
+    "packet descriptor (on-chip)": "packet_descriptor_on_chip",
+}
+
+
+def _samples(text: str | None) -> array:
+    """``"3,5,4"`` → ``array('f', [3, 5, 4])``, newest sample first."""
+    return array("f", (float(v) for v in (text or "").split(",") if v.strip()))
+
+
+def parse_resource_monitor(root) -> dict:
+    """Turn ``show running resource-monitor second`` into per-core statistics.
+
+    Builds a dataplane × core matrix of the per-second load samples (the
+    firewall returns the last 60 seconds) and reduces it to mean, max, p95
+    and the busiest core. Cores that report only zeros are reserved cores
+    and are left out. Packet buffer/descriptor utilisation is the newest
+    sample of the same response.
+    """
+    matrix = {}
+    resources = {}
+    for dp in root.iterfind("./result/resource-monitor/data-processors/*"):
+        second = dp.find("second")
+        if second is None:
+            continue
+        for entry in second.iterfind("./cpu-load-average/entry"):
+            samples = _samples(entry.findtext("value"))
+            if any(samples):
+                matrix[f"{dp.tag}/{entry.findtext('coreid')}"] = samples
+        for entry in second.iterfind("./resource-utilization/entry"):
+            key = RESOURCE_KEYS.get(entry.findtext("name"))
+            samples = _samples(entry.findtext("value"))
+            if key and samples:
+                # Several dataplanes: report the most utilised one.
+                resources[key] = max(resources.get(key, 0.0), samples[0])
+
+    core_means = {core: sum(s) / len(s) for core, s in matrix.items()}
+    all_samples = sorted(v for s in matrix.values() for v in s)
+    busiest = max(core_means, key=core_means.get) if core_means else None
+
+    data = {
+        "dataplane_cpu": round(sum(all_samples) / len(all_samples), 1) if all_samples else 0.0,
+        "dataplane_cpu_max": all_samples[-1] if all_samples else 0.0,
+        "dataplane_cpu_p95": round(percentile(all_samples, 95) or 0.0, 1),
+        "dataplane_busiest_core": busiest,
+        "dataplane_cores": {core: round(mean, 1) for core, mean in core_means.items()},
+    }
+    for key in RESOURCE_KEYS.values():
+        data[key] = resources.get(key)
+    return data
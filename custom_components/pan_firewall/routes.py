@@ -0,0 +1,83 @@
+"""Routing table parsing for PAN Firewall."""
+
+# Route flag → protocol. Flags not listed here (A active, ? loose, E ecmp,
+# M multicast) say nothing about where the route came from.
+ROUTE_PROTOCOLS = {
+    "C": "connect",
+    "H": "host",
+    "S": "static",
+    "~": "internal",
+    "R": "rip",
+    "O": "ospf",
+    "Oi": "ospf",
+    "Oo": "ospf",
+    "O1": "ospf",
+    "O2": "ospf",
+    "B": "bgp",
+}
+
+PROTOCOL_NAMES = {
+    "connect": "Connected",
+    "host": "Host",
+    "static": "Static",
+    "ospf": "OSPF",
+    "bgp": "BGP",
+    "rip": "RIP",
+}
+
+
+def route_protocol(flags: str) -> str:
+    for flag in flags.split():
+        if flag in ROUTE_PROTOCOLS:
+            return ROUTE_PROTOCOLS[flag]
+    return "other"
+
+
+class RouteCollector:
+    """Count a streamed ``show routing route`` response entry by entry.
+
+    Each ``<entry>`` is counted and then removed from its parent, so memory
+    stays flat no matter how many routes the table holds.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.ipv4 = 0
+        self.ipv6 = 0
+        self.by_vr = {}
+        self.by_protocol = dict.fromkeys(PROTOCOL_NAMES, 0)
+        self._stack = []
+
+    def handle(self, event: str, elem) -> None:
+        if event == "start":
+            self._stack.append(elem)
+            return
+
+        self._stack.pop()
+        if not self._stack:
+            return
+        parent = self._stack[-1]
+        if elem.tag != "entry" or parent.tag != "result":
+            if parent.tag == "result":
+                parent.remove(elem)  # e.g. the <flags> legend
+            return
+
+        self.total += 1
+        if ":" in (elem.findtext("destination") or ""):
+            self.ipv6 += 1
+        else:
+            self.ipv4 += 1
+        vr = elem.findtext("virtual-router") or "default"
+        self.by_vr[vr] = self.by_vr.get(vr, 0) + 1
+        protocol = route_protocol(elem.findtext("flags") or "")
+        self.by_protocol[protocol] = self.by_protocol.get(protocol, 0) + 1
+        parent.remove(elem)
+
+    def as_data(self) -> dict:
+        return {
+            "number_of_routes": self.total,
+            "routes_ipv4": self.ipv4,
+            "routes_ipv6": self.ipv6,
+            "routes_by_vr": self.by_vr,
+            "routes_by_protocol": self.by_protocol,
+        }
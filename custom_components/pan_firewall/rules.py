@@ -0,0 +1,172 @@
+"""Rulebase parsing for PAN Firewall."""
+
+import sys
+from typing import NamedTuple
+
+# <rulebase> child tag → key in coordinator.data
+RULEBASES = {
+    "security": "security_rules",
+    "nat": "nat_rules",
+    "decryption": "decryption_rules",
+}
+
+
+class RuleSnapshot:
+    """The parts of a rule the entities and services read.
+
+    Only the fields used by the entities, services and the local policy
+    matcher are kept; rule changes are written straight to the rule's
+    xpath, so the full config entry is never needed in memory. Member names
+    repeat across thousands of rules and are interned.
+    """
+
+    __slots__ = (
+        "name",
+        "disabled",
+        "tags",
+        "from_zones",
+        "to_zones",
+        "sources",
+        "destinations",
+        "negate_source",
+        "negate_destination",
+        "applications",
+        "services",
+        "action",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        disabled: bool,
+        tags: tuple = (),
+        from_zones: tuple = ("any",),
+        to_zones: tuple = ("any",),
+        sources: tuple = ("any",),
+        destinations: tuple = ("any",),
+        negate_source: bool = False,
+        negate_destination: bool = False,
+        applications: tuple = ("any",),
+        services: tuple = ("any",),
+        action: str | None = None,
+    ):
+        self.name = name
+        self.disabled = disabled
+        self.tags = tags
+        self.from_zones = from_zones
+        self.to_zones = to_zones
+        self.sources = sources
+        self.destinations = destinations
+        self.negate_source = negate_source
+        self.negate_destination = negate_destination
+        self.applications = applications
+        self.services = services
+        self.action = action
+
+    @classmethod
+    def from_entry(cls, entry) -> "RuleSnapshot":
+        return cls(
+            entry.get("name"),
+            entry.findtext("disabled") == "yes",
+            _members(entry, "tag"),
+            _members(entry, "from"),
+            _members(entry, "to"),
+            _members(entry, "source"),
+            _members(entry, "destination"),
+            entry.findtext("negate-source") == "yes",
+            entry.findtext("negate-destination") == "yes",
+            _members(entry, "application"),
+            _members(entry, "service"),
+            entry.findtext("action"),
+        )
+
+    def replace(self, **changes) -> "RuleSnapshot":
+        """Copy of this snapshot with some fields changed."""
+        new = object.__new__(type(self))
+        for slot in self.__slots__:
+            setattr(new, slot, changes.get(slot, getattr(self, slot)))
+        return new
+
+    def __eq__(self, other):
+        if not isinstance(other, RuleSnapshot):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, slot) for slot in self.__slots__))
+
+    def __repr__(self):
+        return f"RuleSnapshot({self.name!r}, disabled={self.disabled})"
+
+
+def _members(entry, tag: str) -> tuple:
+    return tuple(sys.intern(m.text) for m in entry.iterfind(f"./{tag}/member") if m.text)
+
+
+class RulebaseCollector:
+    """Build every rule map from one streamed ``<rulebase>`` response.
+
+    Feed it the ``(event, element)`` pairs of a start/end pull parser. Each
+    finished rule ``<entry>`` is taken out of its ``<rules>`` parent as soon
+    as it is complete and reduced to a ``RuleSnapshot``, so the parsed
+    document never grows beyond the rule being read.
+    """
+
+    def __init__(self):
+        self.rules = {key: {} for key in RULEBASES.values()}
+        self._stack = []
+
+    def handle(self, event: str, elem) -> None:
+        if event == "start":
+            self._stack.append(elem)
+            return
+
+        self._stack.pop()
+        if elem.tag != "entry" or len(self._stack) < 2:
+            return
+        parent, rulebase = self._stack[-1], self._stack[-2]
+        if parent.tag == "rules" and rulebase.tag in RULEBASES:
+            rule = RuleSnapshot.from_entry(elem)
+            self.rules[RULEBASES[rulebase.tag]][rule.name] = rule
+            parent.remove(elem)
+
+
+class RuleHits(NamedTuple):
+    """Hit counter of one rule; timestamps are epoch seconds, 0 = never."""
+
+    hits: int
+    last_hit: int
+    first_hit: int
+
+
+class HitCountCollector:
+    """Build a name → ``RuleHits`` index from a streamed ``show rule-hit-count``."""
+
+    def __init__(self):
+        self.hits = {}
+        self._stack = []
+
+    def handle(self, event: str, elem) -> None:
+        if event == "start":
+            self._stack.append(elem)
+            return
+
+        self._stack.pop()
+        if elem.tag != "entry" or not self._stack or self._stack[-1].tag != "rules":
+            return
+        self.hits[elem.get("name")] = RuleHits(
+            int(elem.findtext("hit-count") or 0),
+            int(elem.findtext("last-hit-timestamp") or 0),
+            int(elem.findtext("first-hit-timestamp") or 0),
+        )
+        self._stack[-1].remove(elem)
+
+
+def hit_count_cmd(vsys: str, rulebase: str = "security") -> str:
+    return (
+        "<show><rule-hit-count><vsys><vsys-name>"
+        f"<entry name='{vsys}'><rule-base><entry name='{rulebase}'>"
+        "<rules><all/></rules>"
+        "</entry></rule-base></entry>"
+        "</vsys-name></vsys></rule-hit-count></show>"
+    )
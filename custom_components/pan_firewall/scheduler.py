@@ -0,0 +1,172 @@
+"""Domain-wide poll scheduler for PAN Firewall."""
+
+import asyncio
+from contextlib import asynccontextmanager
+import heapq
+import itertools
+import time
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, GLOBAL_BURST, GLOBAL_MAX_CONCURRENCY, GLOBAL_RATE_LIMIT, MAX_STAGGER
+
+# Lower runs first: refreshes asked for after a switch toggle or a commit
+# go ahead of the periodic polls of every other firewall.
+PRIORITY_USER = 0
+PRIORITY_BACKGROUND = 1
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> "PollScheduler":
+    """The scheduler shared by every config entry, created on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if "scheduler" not in domain_data:
+        domain_data["scheduler"] = PollScheduler(GLOBAL_MAX_CONCURRENCY, GLOBAL_RATE_LIMIT, GLOBAL_BURST)
+    return domain_data["scheduler"]
+
+
+class PollScheduler:
+    """Spread the polls of all firewalls over time.
+
+    Every coordinator polls on its own timer; left alone they all fire at
+    HA startup and keep firing together. The scheduler:
+
+    * staggers background polls, spacing their starts evenly over the
+      shortest poll interval (at most ``MAX_STAGGER`` apart), so timers that
+      started together drift apart after one round;
+    * caps the poll commands in flight across all entries;
+    * limits how fast commands start with a token bucket (``rate`` per
+      second, bursts of ``burst``);
+    * hands free slots and tokens to user-triggered refreshes first.
+
+    The per-firewall (or per-Panorama) semaphore still applies below it.
+    """
+
+    def __init__(self, max_concurrency: int, rate: float, burst: int):
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst
+        self._free = max_concurrency
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        # Heap of (priority, sequence, future): FIFO within a priority.
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._wakeup = None
+        self._coordinators = set()
+        self._next_start = 0.0
+        self.commands_started = 0
+        self.commands_delayed = 0
+
+    @callback
+    def async_register(self, coordinator):
+        """Count a coordinator in the stagger spacing; returns the undo callback."""
+        self._coordinators.add(coordinator)
+
+        @callback
+        def unregister() -> None:
+            self._coordinators.discard(coordinator)
+
+        return unregister
+
+    def _spacing(self) -> float:
+        if not self._coordinators:
+            return 0.0
+        shortest = min(c.update_interval.total_seconds() for c in self._coordinators)
+        return min(shortest / len(self._coordinators), MAX_STAGGER)
+
+    async def async_wait_turn(self) -> None:
+        """Wait for this background poll's start slot."""
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + self._spacing()
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    @asynccontextmanager
+    async def slot(self, priority: int):
+        """Hold one of the global slots while a poll command runs."""
+        await self.async_acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def async_acquire(self, priority: int) -> None:
+        """Wait for a free slot and a token; call ``release`` when done."""
+        if not self._waiters and self._try_take():
+            return
+        self.commands_delayed += 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just before the cancellation arrived: give it back.
+            # A still-queued future is cancelled and skipped by _dispatch.
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    @callback
+    def try_acquire(self) -> bool:
+        """Take a slot and a token only if both are free right now."""
+        return not self._waiters and self._try_take()
+
+    @callback
+    def release(self) -> None:
+        self._free += 1
+        self._dispatch()
+
+    def _try_take(self) -> bool:
+        self._refill()
+        if self._free == 0 or self._tokens < 1:
+            return False
+        self._free -= 1
+        self._tokens -= 1
+        self.commands_started += 1
+        return True
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    @callback
+    def _dispatch(self) -> None:
+        """Hand slots and tokens to the waiters, best priority first."""
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._try_take():
+                break
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+
+        if self._waiters and self._free and self._wakeup is None:
+            # Out of tokens: come back when the next one is there. (Out of
+            # slots needs no timer, ``release`` dispatches.)
+            delay = (1 - self._tokens) / self.rate
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._on_wakeup)
+
+    @callback
+    def _on_wakeup(self) -> None:
+        self._wakeup = None
+        self._dispatch()
+
+    def diagnostics(self) -> dict:
+        self._refill()
+        return {
+            "coordinators": len(self._coordinators),
+            "stagger_spacing": round(self._spacing(), 2),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.max_concurrency - self._free,
+            "rate_limit": self.rate,
+            "tokens": round(self._tokens, 2),
+            "waiting": sum(1 for _, _, future in self._waiters if not future.done()),
+            "commands_started": self.commands_started,
+            "commands_delayed": self.commands_delayed,
+        }
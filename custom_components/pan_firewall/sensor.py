@@ -1,19 +1,64 @@
 """Sensor platform for PAN Firewall metrics."""
 
-from homeassistant.components.sensor import SensorEntity, SensorStateClass
-from homeassistant.core import HomeAssistant
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from homeassistant.const import UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers import device_registry as dr
 
-from .const import DOMAIN
+from .const import DOMAIN, HISTORY_WINDOW
+from .routes import PROTOCOL_NAMES
+
+# Version field → system info field holding its release date
+RELEASE_DATE_KEYS = {
+    "wildfire_version": "wildfire_release_date",
+    "threat_version": "threat_release_date",
+    "app_version": "app_release_date",
+    "av_version": "av_release_date",
+    "device_dictionary_version": "device_dictionary_release_date",
+    "global_protect_datafile_version": "global_protect_datafile_release_date",
+}
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry, async_add_entities: AddEntitiesCallback
 ):
-    data = hass.data[DOMAIN][entry.entry_id]
+    entities = []
+    for data in hass.data[DOMAIN][entry.entry_id]["devices"]:
+        entities.extend(_device_entities(data))
+    async_add_entities(entities)
+    for data in hass.data[DOMAIN][entry.entry_id]["devices"]:
+        _async_setup_vr_sensors(entry, data, async_add_entities)
+
+
+@callback
+def _async_setup_vr_sensors(entry, data: dict, async_add_entities: AddEntitiesCallback):
+    """Add a route count sensor for every virtual router, including ones added later."""
+    coordinator = data["coordinator"]
+    known = set()
+
+    @callback
+    def _async_add_new_vrs():
+        added = coordinator.data.get("routes_by_vr", {}).keys() - known
+        if not added:
+            return
+        known.update(added)
+        async_add_entities(
+            PanFirewallRouteBreakdownSensor(
+                coordinator, "routes_by_vr", vr, f"Routes in {vr}",
+                data["serial"], data["hostname"], data["model"], data["version"], data["fw"],
+            )
+            for vr in sorted(added)
+        )
+
+    _async_add_new_vrs()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_vrs))
+
+
+def _device_entities(data: dict) -> list:
+    """Entities of one firewall (fleet entries have several)."""
     coordinator = data["coordinator"]
     serial = data["serial"]
     hostname = data["hostname"]
@@ -25,11 +70,18 @@ async def async_setup_entry(
     # Numeric metrics
     metrics = {
         "dataplane_cpu": ("Dataplane CPU", "%", "percentage", SensorStateClass.MEASUREMENT),
+        "dataplane_cpu_max": ("Dataplane CPU Max", "%", "percentage", SensorStateClass.MEASUREMENT),
+        "dataplane_cpu_p95": ("Dataplane CPU P95", "%", "percentage", SensorStateClass.MEASUREMENT),
+        "packet_buffer": ("Packet Buffer Utilization", "%", "percentage", SensorStateClass.MEASUREMENT),
+        "packet_descriptor": ("Packet Descriptor Utilization", "%", "percentage", SensorStateClass.MEASUREMENT),
+        "packet_descriptor_on_chip": ("Packet Descriptor (On-Chip) Utilization", "%", "percentage", SensorStateClass.MEASUREMENT),
         "management_cpu": ("Management CPU", "%", "percentage", SensorStateClass.MEASUREMENT),
         "concurrent_connections": ("Concurrent Connections", "sessions", None, SensorStateClass.MEASUREMENT),
         "connections_per_second": ("Connections per Second", "cps", None, SensorStateClass.MEASUREMENT),
         "total_throughput_kbps": ("Total Throughput", "Mbps", "data_rate", SensorStateClass.MEASUREMENT),
         "number_of_routes": ("Number of Routes", "routes", None, SensorStateClass.TOTAL),
+        "routes_ipv4": ("IPv4 Routes", "routes", None, SensorStateClass.TOTAL),
+        "routes_ipv6": ("IPv6 Routes", "routes", None, SensorStateClass.TOTAL),
     }
 
     for key, (name, unit, device_class, state_class) in metrics.items():
@@ -49,12 +101,49 @@ async def async_setup_entry(
             )
         )
 
-    # Rule count sensors
-    entities.extend([
-        PanFirewallRuleCountSensor(coordinator, "security_rules", "Security Rules Total", serial, hostname, model, version, data["fw"]),
-        PanFirewallRuleCountSensor(coordinator, "nat_rules", "NAT Rules Total", serial, hostname, model, version, data["fw"]),
-        PanFirewallRuleCountSensor(coordinator, "decryption_rules", "Decryption Rules Total", serial, hostname, model, version, data["fw"]),
-    ])
+    entities.append(
+        PanFirewallBusiestCoreSensor(coordinator, serial, hostname, model, version, data["fw"])
+    )
+
+    # Route breakdown: one sensor per protocol (per virtual router, see
+    # _async_setup_vr_sensors)
+    for protocol, friendly_name in PROTOCOL_NAMES.items():
+        entities.append(
+            PanFirewallRouteBreakdownSensor(
+                coordinator, "routes_by_protocol", protocol, f"{friendly_name} Routes",
+                serial, hostname, model, version, data["fw"],
+            )
+        )
+
+    # Rule count sensors, per polled vsys (the first one without a suffix)
+    for vsys in coordinator.vsys_list:
+        suffix = "" if vsys == coordinator.vsys else f" ({vsys})"
+        entities.extend([
+            PanFirewallRuleCountSensor(
+                coordinator, coordinator.vsys_key(rule_type, vsys), f"{name}{suffix}",
+                serial, hostname, model, version, data["fw"],
+            )
+            for rule_type, name in (
+                ("security_rules", "Security Rules Total"),
+                ("nat_rules", "NAT Rules Total"),
+                ("decryption_rules", "Decryption Rules Total"),
+            )
+        ])
+        entities.append(
+            PanFirewallSensor(
+                coordinator=coordinator,
+                key=coordinator.vsys_key("rules_unused", vsys),
+                name=f"Security Rules Unused ({coordinator.unused_rule_days} d){suffix}",
+                unit="rules",
+                device_class=None,
+                state_class=SensorStateClass.MEASUREMENT,
+                serial=serial,
+                hostname=hostname,
+                model=model,
+                version=version,
+                fw=data["fw"],
+            )
+        )
 
     # Commit Pending sensor (shows yes or no)
     entities.append(
@@ -69,6 +158,29 @@ async def async_setup_entry(
         )
     )
 
+    entities.append(
+        PanFirewallCommitStatusSensor(data["commit_scheduler"], serial, hostname, model, version, data["fw"])
+    )
+
+    # Coordinator housekeeping (diagnostic)
+    for attr, name in (
+        ("state_writes_issued", "State Writes Issued"),
+        ("state_writes_skipped", "State Writes Skipped"),
+    ):
+        entities.append(
+            PanFirewallCoordinatorStatSensor(coordinator, attr, name, serial, hostname, model, version, data["fw"])
+        )
+    entities.append(
+        PanFirewallCoordinatorStatSensor(
+            coordinator, "effective_scan_interval", "Effective Scan Interval",
+            serial, hostname, model, version, data["fw"], unit=UnitOfTime.SECONDS,
+        )
+    )
+    for command in coordinator.command_stats:
+        entities.append(
+            PanFirewallCommandSensor(coordinator, command, serial, hostname, model, version, data["fw"])
+        )
+
     # System info fields
     system_info = coordinator.data.get("system_info", {})
 
@@ -136,12 +248,12 @@ async def async_setup_entry(
                     )
                 )
 
-    async_add_entities(entities, update_before_add=True)
+    return entities
 
 
 class PanFirewallSensor(CoordinatorEntity, SensorEntity):
     def __init__(self, coordinator, key: str, name: str, unit: str | None, device_class: str | None, state_class, serial, hostname, model, version, fw):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=frozenset({key, ("metric_stats", key)}))
         self._key = key
         self._attr_name = name
         self._attr_unique_id = f"pan_{serial}_{key}"
@@ -155,13 +267,95 @@ class PanFirewallSensor(CoordinatorEntity, SensorEntity):
         self._version = version
         self._fw = fw
 
-    @property
-    def native_value(self):
-        val = self.coordinator.data.get(self._key)
+    def _scale(self, val):
         if self._key == "total_throughput_kbps" and val is not None:
             return round(val / 1000, 1)
         return val
 
+    @property
+    def native_value(self):
+        return self._scale(self.coordinator.data.get(self._key))
+
+    @property
+    def extra_state_attributes(self):
+        """Rolling min/max/avg/p95 over the last few minutes, from memory."""
+        stats = self.coordinator.data.get("metric_stats", {}).get(self._key)
+        if not stats:
+            return None
+        minutes = HISTORY_WINDOW // 60
+        return {f"{name}_{minutes}m": self._scale(value) for name, value in stats.items()}
+
+    @property
+    def device_info(self):
+        return dr.DeviceInfo(
+            identifiers={(DOMAIN, self._serial)},
+            name=self._hostname,
+            manufacturer="Palo Alto Networks",
+            model=self._model,
+            sw_version=self._version,
+            configuration_url=f"https://{self._fw.hostname}",
+            entry_type=dr.DeviceEntryType.SERVICE,
+        )
+
+
+class PanFirewallBusiestCoreSensor(CoordinatorEntity, SensorEntity):
+    """Dataplane core with the highest average load over the last minute."""
+
+    def __init__(self, coordinator, serial, hostname, model, version, fw):
+        super().__init__(coordinator, context=frozenset({"dataplane_busiest_core", "dataplane_cores"}))
+        self._attr_name = "Busiest Dataplane Core"
+        self._attr_unique_id = f"pan_{serial}_dataplane_busiest_core"
+        self._attr_icon = "mdi:cpu-64-bit"
+        self._serial = serial
+        self._hostname = hostname
+        self._model = model
+        self._version = version
+        self._fw = fw
+
+    @property
+    def native_value(self):
+        return self.coordinator.data.get("dataplane_busiest_core")
+
+    @property
+    def extra_state_attributes(self):
+        cores = self.coordinator.data.get("dataplane_cores") or {}
+        return {"load": cores.get(self.native_value), "cores": cores}
+
+    @property
+    def device_info(self):
+        return dr.DeviceInfo(
+            identifiers={(DOMAIN, self._serial)},
+            name=self._hostname,
+            manufacturer="Palo Alto Networks",
+            model=self._model,
+            sw_version=self._version,
+            configuration_url=f"https://{self._fw.hostname}",
+            entry_type=dr.DeviceEntryType.SERVICE,
+        )
+
+
+class PanFirewallRouteBreakdownSensor(CoordinatorEntity, SensorEntity):
+    """Route count for one protocol or virtual router."""
+
+    def __init__(self, coordinator, group: str, key: str, name: str, serial, hostname, model, version, fw):
+        super().__init__(coordinator, context=frozenset({(group, key)}))
+        self._group = group
+        self._key = key
+        self._attr_name = name
+        self._attr_unique_id = f"pan_{serial}_{group}_{key}"
+        self._attr_native_unit_of_measurement = "routes"
+        self._attr_icon = "mdi:routes"
+        self._attr_state_class = SensorStateClass.TOTAL
+        self._serial = serial
+        self._hostname = hostname
+        self._model = model
+        self._version = version
+        self._fw = fw
+
+    @property
+    def native_value(self):
+        return self.coordinator.data.get(self._group, {}).get(self._key, 0)
+
     @property
     def device_info(self):
         return dr.DeviceInfo(
@@ -177,7 +371,7 @@ class PanFirewallSensor(CoordinatorEntity, SensorEntity):
 
 class PanFirewallRuleCountSensor(CoordinatorEntity, SensorEntity):
     def __init__(self, coordinator, rule_type: str, name: str, serial, hostname, model, version, fw):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=frozenset({rule_type}))
         self._rule_type = rule_type
         self._attr_name = name
         self._attr_unique_id = f"pan_{serial}_{rule_type}_total"
@@ -210,7 +404,7 @@ class PanFirewallCommitPendingSensor(CoordinatorEntity, SensorEntity):
     """Shows exactly 'yes' or 'no' from the firewall."""
 
     def __init__(self, coordinator, name: str, serial, hostname, model, version, fw):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=frozenset({"commit_pending"}))
         self._attr_name = name
         self._attr_unique_id = f"pan_{serial}_commit_pending"
         self._attr_icon = "mdi:git"
@@ -237,9 +431,144 @@ class PanFirewallCommitPendingSensor(CoordinatorEntity, SensorEntity):
         )
 
 
+class PanFirewallCommitStatusSensor(SensorEntity):
+    """State of the batched commit queue: idle, queued, running, finished or failed."""
+
+    _attr_should_poll = False
+
+    def __init__(self, commit_scheduler, serial, hostname, model, version, fw):
+        self._commit_scheduler = commit_scheduler
+        self._attr_name = "Commit Status"
+        self._attr_unique_id = f"pan_{serial}_commit_status"
+        self._attr_icon = "mdi:source-commit"
+        self._serial = serial
+        self._hostname = hostname
+        self._model = model
+        self._version = version
+        self._fw = fw
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            self._commit_scheduler.async_add_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def native_value(self):
+        return self._commit_scheduler.state
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "job_id": self._commit_scheduler.job_id,
+            "pending_changes": self._commit_scheduler.pending_changes,
+            "last_error": self._commit_scheduler.last_error,
+        }
+
+    @property
+    def device_info(self):
+        return dr.DeviceInfo(
+            identifiers={(DOMAIN, self._serial)},
+            name=self._hostname,
+            manufacturer="Palo Alto Networks",
+            model=self._model,
+            sw_version=self._version,
+            configuration_url=f"https://{self._fw.hostname}",
+            entry_type=dr.DeviceEntryType.SERVICE,
+        )
+
+
+class PanFirewallCoordinatorStatSensor(CoordinatorEntity, SensorEntity):
+    """Per-poll counter kept on the coordinator itself (not in ``data``)."""
+
+    def __init__(self, coordinator, attr: str, name: str, serial, hostname, model, version, fw, unit=None):
+        # No context: refreshed on every poll, like any plain listener.
+        super().__init__(coordinator)
+        self._attr = attr
+        self._attr_name = name
+        self._attr_unique_id = f"pan_{serial}_{attr}"
+        if unit is None:
+            self._attr_icon = "mdi:counter"
+        else:
+            self._attr_device_class = SensorDeviceClass.DURATION
+            self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._serial = serial
+        self._hostname = hostname
+        self._model = model
+        self._version = version
+        self._fw = fw
+
+    @property
+    def native_value(self):
+        return getattr(self.coordinator, self._attr)
+
+    @property
+    def device_info(self):
+        return dr.DeviceInfo(
+            identifiers={(DOMAIN, self._serial)},
+            name=self._hostname,
+            manufacturer="Palo Alto Networks",
+            model=self._model,
+            sw_version=self._version,
+            configuration_url=f"https://{self._fw.hostname}",
+            entry_type=dr.DeviceEntryType.SERVICE,
+        )
+
+
+class PanFirewallCommandSensor(CoordinatorEntity, SensorEntity):
+    """Latency of one poll command, with its counters as attributes.
+
+    Disabled by default: it changes on every poll the command runs in.
+    """
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_suggested_display_precision = 3
+
+    def __init__(self, coordinator, command: str, serial, hostname, model, version, fw):
+        super().__init__(coordinator)
+        self._command = command
+        self._attr_name = f"Command {command.replace('_', ' ').title()} Latency"
+        self._attr_unique_id = f"pan_{serial}_command_{command}"
+        self._serial = serial
+        self._hostname = hostname
+        self._model = model
+        self._version = version
+        self._fw = fw
+
+    @property
+    def native_value(self):
+        return self.coordinator.command_stats[self._command].latency_last
+
+    @property
+    def extra_state_attributes(self):
+        stats = self.coordinator.command_stats[self._command].as_dict()
+        stats.pop("latency_last")
+        return stats
+
+    @property
+    def device_info(self):
+        return dr.DeviceInfo(
+            identifiers={(DOMAIN, self._serial)},
+            name=self._hostname,
+            manufacturer="Palo Alto Networks",
+            model=self._model,
+            sw_version=self._version,
+            configuration_url=f"https://{self._fw.hostname}",
+            entry_type=dr.DeviceEntryType.SERVICE,
+        )
+
+
 class PanFirewallSystemFieldSensor(CoordinatorEntity, SensorEntity):
     def __init__(self, coordinator, key: str, name: str, serial, hostname, model, version, fw):
-        super().__init__(coordinator)
+        context = {("system_info", key)}
+        if key in RELEASE_DATE_KEYS:
+            context.add(("system_info", RELEASE_DATE_KEYS[key]))
+        super().__init__(coordinator, context=frozenset(context))
         self._key = key
         self._attr_name = name
         self._attr_unique_id = f"pan_{serial}_sys_{key}"
@@ -267,17 +596,8 @@ class PanFirewallSystemFieldSensor(CoordinatorEntity, SensorEntity):
         attrs = {}
         system_info = self.coordinator.data.get("system_info", {})
 
-        date_map = {
-            "wildfire_version": "wildfire_release_date",
-            "threat_version": "threat_release_date",
-            "app_version": "app_release_date",
-            "av_version": "av_release_date",
-            "device_dictionary_version": "device_dictionary_release_date",
-            "global_protect_datafile_version": "global_protect_datafile_release_date",
-        }
-
-        if self._key in date_map:
-            date_key = date_map[self._key]
+        if self._key in RELEASE_DATE_KEYS:
+            date_key = RELEASE_DATE_KEYS[self._key]
             if date_key in system_info:
                 attrs["release_date"] = system_info[date_key]
 
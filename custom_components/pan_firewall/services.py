@@ -0,0 +1,230 @@
+"""Services for PAN Firewall."""
+
+import ipaddress
+import re
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+
+from .api import PanOsApiError, rule_xpath
+from .const import DOMAIN
+from .objects import AddressBook
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_SERIAL = "serial"
+ATTR_VSYS = "vsys"
+ATTR_RULES = "rules"
+ATTR_REGEX = "regex"
+ATTR_TAG = "tag"
+ATTR_DISABLED = "disabled"
+ATTR_FROM_ZONE = "from_zone"
+ATTR_TO_ZONE = "to_zone"
+ATTR_SOURCE = "source"
+ATTR_DESTINATION = "destination"
+ATTR_PROTOCOL = "protocol"
+ATTR_PORT = "port"
+ATTR_APPLICATION = "application"
+ATTR_ADDRESS = "address"
+ATTR_INCLUDE_ANY = "include_any"
+
+SERVICE_SET_RULES_DISABLED = "set_rules_disabled"
+SERVICE_TEST_POLICY_MATCH = "test_policy_match"
+SERVICE_FIND_RULES_BY_IP = "find_rules_by_ip"
+
+
+def _ip_address(value: str) -> str:
+    try:
+        ipaddress.ip_address(value)
+    except ValueError as err:
+        raise vol.Invalid(f"Invalid IP address: {value}") from err
+    return value
+
+
+SET_RULES_DISABLED_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+            vol.Optional(ATTR_SERIAL): cv.string,
+            vol.Optional(ATTR_VSYS): cv.string,
+            vol.Optional(ATTR_RULES): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional(ATTR_REGEX): cv.is_regex,
+            vol.Optional(ATTR_TAG): cv.string,
+            vol.Required(ATTR_DISABLED): cv.boolean,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_RULES, ATTR_REGEX, ATTR_TAG),
+)
+
+TEST_POLICY_MATCH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_SERIAL): cv.string,
+        vol.Optional(ATTR_VSYS): cv.string,
+        vol.Required(ATTR_FROM_ZONE): cv.string,
+        vol.Required(ATTR_TO_ZONE): cv.string,
+        vol.Required(ATTR_SOURCE): vol.All(cv.string, _ip_address),
+        vol.Required(ATTR_DESTINATION): vol.All(cv.string, _ip_address),
+        vol.Required(ATTR_PROTOCOL): cv.string,
+        vol.Optional(ATTR_PORT): cv.port,
+        vol.Optional(ATTR_APPLICATION): cv.string,
+    }
+)
+
+FIND_RULES_BY_IP_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_SERIAL): cv.string,
+        vol.Optional(ATTR_VSYS): cv.string,
+        vol.Required(ATTR_ADDRESS): vol.All(cv.string, _ip_address),
+        vol.Optional(ATTR_INCLUDE_ANY, default=False): cv.boolean,
+    }
+)
+
+
+def _entry_data(hass: HomeAssistant, call: ServiceCall) -> dict:
+    """Resolve the firewall a service call targets.
+
+    A Panorama entry holds several firewalls, so besides the config entry
+    a call can name the firewall by serial.
+    """
+    # hass.data[DOMAIN] also holds the shared poll scheduler.
+    entries = {key: value for key, value in hass.data.get(DOMAIN, {}).items() if isinstance(value, dict)}
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    serial = call.data.get(ATTR_SERIAL)
+    if entry_id is not None and entry_id not in entries:
+        raise ServiceValidationError(f"Unknown PAN Firewall config entry {entry_id}")
+
+    devices = [
+        device
+        for key, entry in entries.items()
+        if entry_id in (None, key)
+        for device in entry["devices"]
+        if serial in (None, device["serial"])
+    ]
+    if not devices and serial is not None:
+        raise ServiceValidationError(f"Unknown firewall {serial}")
+    if len(devices) != 1:
+        raise ServiceValidationError(
+            f"{ATTR_CONFIG_ENTRY_ID} or {ATTR_SERIAL} is required when more than one firewall is configured"
+        )
+    return devices[0]
+
+
+def _vsys(coordinator, call: ServiceCall) -> str:
+    """The vsys a service call targets; the first polled vsys by default."""
+    vsys = call.data.get(ATTR_VSYS, coordinator.vsys)
+    if vsys not in coordinator.vsys_list:
+        raise ServiceValidationError(f"Vsys {vsys} is not polled on this firewall")
+    return vsys
+
+
+def _select_rules(rules: dict, call: ServiceCall) -> list[str]:
+    """Names matched by any of the rules/regex/tag selectors, in rulebase order."""
+    names = set(call.data.get(ATTR_RULES, []))
+    missing = names - rules.keys()
+    if missing:
+        raise ServiceValidationError(f"Unknown rule(s): {', '.join(sorted(missing))}")
+
+    regex = call.data.get(ATTR_REGEX)
+    pattern = re.compile(regex) if regex else None
+    tag = call.data.get(ATTR_TAG)
+
+    return [
+        name
+        for name, rule in rules.items()
+        if name in names
+        or (pattern is not None and pattern.search(name))
+        or (tag is not None and tag in rule.tags)
+    ]
+
+
+async def _async_set_rules_disabled(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    data = _entry_data(hass, call)
+    coordinator = data["coordinator"]
+    vsys = _vsys(coordinator, call)
+    disabled = call.data[ATTR_DISABLED]
+
+    rules = coordinator.data.get(coordinator.vsys_key("security_rules", vsys), {})
+    selected = _select_rules(rules, call)
+    to_change = [name for name in selected if rules[name].disabled != disabled]
+
+    if to_change:
+        element = f"<disabled>{'yes' if disabled else 'no'}</disabled>"
+        try:
+            await data["fw"].async_multi_config(
+                [("set", rule_xpath(vsys, "security", name), element) for name in to_change]
+            )
+        except PanOsApiError as err:
+            raise HomeAssistantError(f"Updating rules failed: {err}") from err
+
+        coordinator.async_set_rules_disabled("security_rules", to_change, disabled, vsys)
+        data["commit_scheduler"].async_commit_now(len(to_change))
+
+    return {"matched": selected, "changed": to_change}
+
+
+async def _async_test_policy_match(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Evaluate a 5-tuple against the cached rulebase, without asking the firewall."""
+    coordinator = _entry_data(hass, call)["coordinator"]
+    vsys = _vsys(coordinator, call)
+    return coordinator.policies[vsys].match(
+        coordinator.data.get(coordinator.vsys_key("security_rules", vsys), {}),
+        coordinator.address_books.get(vsys) or AddressBook(),
+        from_zone=call.data[ATTR_FROM_ZONE],
+        to_zone=call.data[ATTR_TO_ZONE],
+        source=call.data[ATTR_SOURCE],
+        destination=call.data[ATTR_DESTINATION],
+        protocol=call.data[ATTR_PROTOCOL],
+        port=call.data.get(ATTR_PORT),
+        application=call.data.get(ATTR_APPLICATION),
+    )
+
+
+async def _async_find_rules_by_ip(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Security rules referencing an IP, from the cached rulebase and objects."""
+    coordinator = _entry_data(hass, call)["coordinator"]
+    vsys = _vsys(coordinator, call)
+    return coordinator.policies[vsys].rules_for_address(
+        coordinator.data.get(coordinator.vsys_key("security_rules", vsys), {}),
+        coordinator.address_books.get(vsys) or AddressBook(),
+        call.data[ATTR_ADDRESS],
+        include_any=call.data[ATTR_INCLUDE_ANY],
+    )
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    async def set_rules_disabled(call: ServiceCall) -> ServiceResponse:
+        return await _async_set_rules_disabled(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_RULES_DISABLED,
+        set_rules_disabled,
+        schema=SET_RULES_DISABLED_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def test_policy_match(call: ServiceCall) -> ServiceResponse:
+        return await _async_test_policy_match(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_TEST_POLICY_MATCH,
+        test_policy_match,
+        schema=TEST_POLICY_MATCH_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def find_rules_by_ip(call: ServiceCall) -> ServiceResponse:
+        return await _async_find_rules_by_ip(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_RULES_BY_IP,
+        find_rules_by_ip,
+        schema=FIND_RULES_BY_IP_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,99 @@
+"""Persisted coordinator data for PAN Firewall.
+
+The last good ``coordinator.data`` is written through HA's storage helper
+so that after a restart the entities come up straight away from the saved
+copy while the first real poll runs in the background.
+"""
+
+import logging
+import sys
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .rules import RULEBASES, RuleHits, RuleSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+
+# Rebuilt from the in-memory history, which does not survive a restart.
+_TRANSIENT_KEYS = ("metric_stats",)
+
+# RuleSnapshot members that are tuples of names (JSON turns them into lists)
+_MEMBER_SLOTS = (
+    "tags",
+    "from_zones",
+    "to_zones",
+    "sources",
+    "destinations",
+    "applications",
+    "services",
+)
+
+
+def snapshot_store(hass: HomeAssistant, entry_id: str, serial: str | None = None) -> Store:
+    """Store of one firewall; fleet members of a Panorama entry add their serial."""
+    key = f"{DOMAIN}.{entry_id}" if serial is None else f"{DOMAIN}.{entry_id}.{serial}"
+    return Store(hass, STORAGE_VERSION, key)
+
+
+def encode(data: dict, facts: dict) -> dict:
+    """``coordinator.data`` → JSON-safe dict.
+
+    Rules are stored as lists of their slot values in slot order instead of
+    one object per rule; the rulebase order is kept.
+    """
+    encoded = {}
+    for key, value in data.items():
+        if key in _TRANSIENT_KEYS:
+            continue
+        kind = _kind(key)
+        if kind in RULEBASES.values():
+            value = [[getattr(rule, slot) for slot in RuleSnapshot.__slots__] for rule in value.values()]
+        elif kind == "rule_hits":
+            value = {name: list(hits) for name, hits in value.items()}
+        encoded[key] = value
+    return {"facts": facts, "data": encoded}
+
+
+def decode(stored: dict) -> tuple[dict, dict]:
+    """Inverse of ``encode``: ``(data, facts)``."""
+    data = {}
+    for key, value in stored["data"].items():
+        kind = _kind(key)
+        if kind in RULEBASES.values():
+            value = {values[0]: _rule(values) for values in value}
+        elif kind == "rule_hits":
+            value = {name: RuleHits(*hits) for name, hits in value.items()}
+        data[key] = value
+    return data, stored.get("facts") or {}
+
+
+def _kind(key: str) -> str:
+    """``rule_hits_vsys2`` → ``rule_hits``: vsys other than the first add their name."""
+    for kind in (*RULEBASES.values(), "rule_hits"):
+        if key == kind or key.startswith(f"{kind}_"):
+            return kind
+    return key
+
+
+def _rule(values: list) -> RuleSnapshot:
+    fields = dict(zip(RuleSnapshot.__slots__, values))
+    for slot in _MEMBER_SLOTS:
+        fields[slot] = tuple(sys.intern(m) for m in fields[slot])
+    return RuleSnapshot(**fields)
+
+
+async def async_load_snapshot(store: Store) -> tuple[dict, dict] | None:
+    """Saved ``(data, facts)``, or None when there is nothing usable."""
+    try:
+        stored = await store.async_load()
+        if not stored:
+            return None
+        return decode(stored)
+    except Exception as err:
+        _LOGGER.warning("Ignoring unreadable saved firewall data: %s", err)
+        return None
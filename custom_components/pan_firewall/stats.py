@@ -0,0 +1,169 @@
+"""Small numeric helpers for PAN Firewall metrics."""
+
+from array import array
+from bisect import bisect_left
+import math
+
+
+def percentile(sorted_values, pct: float) -> float | None:
+    """Linear-interpolated percentile of an already sorted sequence."""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return float(sorted_values[low])
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+class RingBuffer:
+    """Fixed-size time series of ``(timestamp, value)`` samples.
+
+    Backed by two preallocated ``array('d')`` so memory is constant; append
+    is O(1) and a window query only walks the samples inside the window.
+    """
+
+    __slots__ = ("_times", "_values", "_size", "_next", "_count")
+
+    def __init__(self, size: int):
+        self._times = array("d", bytes(8 * size))
+        self._values = array("d", bytes(8 * size))
+        self._size = size
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, value: float) -> None:
+        self._times[self._next] = timestamp
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+    def window(self, since: float) -> list[float]:
+        """Values with a timestamp at or after ``since``, newest first."""
+        values = []
+        i = self._next
+        for _ in range(self._count):
+            i = (i - 1) % self._size
+            if self._times[i] < since:
+                break
+            values.append(self._values[i])
+        return values
+
+    def stats(self, now: float, seconds: float) -> dict | None:
+        """min/max/avg/p95 over the last ``seconds``, or None if empty."""
+        values = self.window(now - seconds)
+        if not values:
+            return None
+        values.sort()
+        return {
+            "min": values[0],
+            "max": values[-1],
+            "avg": round(sum(values) / len(values), 1),
+            "p95": round(percentile(values, 95), 1),
+        }
+
+
+# Upper bounds (seconds) of the command latency histogram; one more bucket
+# holds everything slower.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class CommandStats:
+    """Counters of one poll command, updated in place.
+
+    The histogram is a preallocated ``array('L')``; recording a call only
+    bumps numbers. Bytes and parse time are added by the API client while
+    the command runs (see ``api.REQUEST_STATS``) and settled per call by
+    ``record_call``.
+    """
+
+    __slots__ = (
+        "calls",
+        "failures",
+        "latency_last",
+        "latency_max",
+        "latency_total",
+        "histogram",
+        "bytes_last",
+        "bytes_total",
+        "parse_last",
+        "parse_total",
+        "_bytes",
+        "_parse",
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.latency_last = None
+        self.latency_max = 0.0
+        self.latency_total = 0.0
+        self.histogram = array("L", bytes(array("L").itemsize * (len(LATENCY_BUCKETS) + 1)))
+        self.bytes_last = 0
+        self.bytes_total = 0
+        self.parse_last = 0.0
+        self.parse_total = 0.0
+        self._bytes = 0
+        self._parse = 0.0
+
+    def add_response(self, nbytes: int, parse_seconds: float) -> None:
+        self._bytes += nbytes
+        self._parse += parse_seconds
+
+    def record_call(self, seconds: float, failed: bool) -> None:
+        self.calls += 1
+        if failed:
+            self.failures += 1
+        self.latency_last = seconds
+        self.latency_total += seconds
+        if seconds > self.latency_max:
+            self.latency_max = seconds
+        self.histogram[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.bytes_last = self._bytes
+        self.bytes_total += self._bytes
+        self.parse_last = self._parse
+        self.parse_total += self._parse
+        self._bytes = 0
+        self._parse = 0.0
+
+    def latency_percentile(self, pct: float) -> float | None:
+        """Upper bound of the histogram bucket holding the ``pct`` percentile.
+
+        Capped at the slowest call seen, so it never overstates the worst case.
+        """
+        if not self.calls:
+            return None
+        rank = self.calls * pct / 100
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.histogram):
+            seen += count
+            if seen >= rank:
+                return min(bound, _round(self.latency_max))
+        return _round(self.latency_max)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "latency_last": _round(self.latency_last),
+            "latency_avg": _round(self.latency_total / self.calls) if self.calls else None,
+            "latency_p50": self.latency_percentile(50),
+            "latency_p95": self.latency_percentile(95),
+            "latency_max": _round(self.latency_max),
+            "latency_histogram": {
+                f"le_{bound:g}": count for bound, count in zip(LATENCY_BUCKETS, self.histogram)
+            } | {"inf": self.histogram[-1]},
+            "bytes_last": self.bytes_last,
+            "bytes_total": self.bytes_total,
+            "parse_last": _round(self.parse_last),
+            "parse_total": _round(self.parse_total),
+        }
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(value, 3)
@@ -1,45 +1,112 @@
 """Switch platform for PAN Firewall rules."""
 
+import time
+
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.util import dt as dt_util
 
+from .api import rule_xpath
 from .const import DOMAIN
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry, async_add_entities: AddEntitiesCallback
 ):
-    data = hass.data[DOMAIN][entry.entry_id]
+    for data in hass.data[DOMAIN][entry.entry_id]["devices"]:
+        _async_setup_rule_switches(hass, entry, data, async_add_entities)
+
+
+@callback
+def _async_setup_rule_switches(hass: HomeAssistant, entry, data: dict, async_add_entities: AddEntitiesCallback):
+    """Keep one switch per security rule of one firewall (in every polled vsys)."""
     coordinator = data["coordinator"]
     serial = data["serial"]
     hostname = data["hostname"]
     model = data["model"]
     version = data["version"]
 
-    entities = []
-
-    for rule_name in coordinator.data.get("security_rules", {}).keys():
-        entities.append(
-            PanFirewallRuleSwitch(
-                coordinator=coordinator,
-                rule_name=rule_name,
-                fw=data["fw"],
-                serial=serial,
-                hostname=hostname,
-                model=model,
-                version=version,
+    ent_reg = er.async_get(hass)
+    known = {}
+    last_rules = {}
+
+    @callback
+    def _async_sync_rules():
+        # A vsys that is no longer polled has left vsys_list already; it is
+        # still visited once so its switches are removed.
+        for vsys in known.keys() | set(coordinator.vsys_list):
+            _async_sync_vsys_rules(vsys)
+            if not known.get(vsys):
+                known.pop(vsys, None)
+                last_rules.pop(vsys, None)
+
+    @callback
+    def _async_sync_vsys_rules(vsys: str):
+        """Add switches for new rules and remove those of deleted rules."""
+        rules = coordinator.data.get(coordinator.vsys_key("security_rules", vsys), {})
+        # The coordinator hands back the same dict while the rulebase is unchanged.
+        if rules is last_rules.get(vsys):
+            return
+        last_rules[vsys] = rules
+
+        # Rules of the first vsys keep the ids they had before multi-vsys support.
+        id_vsys = None if vsys == coordinator.vsys else vsys
+        vsys_known = known.setdefault(vsys, set())
+        added = rules.keys() - vsys_known
+        removed = vsys_known - rules.keys()
+
+        for rule_name in removed:
+            vsys_known.discard(rule_name)
+            entity_id = ent_reg.async_get_entity_id("switch", DOMAIN, rule_unique_id(serial, rule_name, id_vsys))
+            if entity_id is not None:
+                ent_reg.async_remove(entity_id)
+
+        if added:
+            vsys_known.update(added)
+            async_add_entities(
+                PanFirewallRuleSwitch(
+                    coordinator=coordinator,
+                    commit_scheduler=data["commit_scheduler"],
+                    rule_name=rule_name,
+                    fw=data["fw"],
+                    serial=serial,
+                    hostname=hostname,
+                    model=model,
+                    version=version,
+                    vsys=vsys,
+                )
+                for rule_name in rules
+                if rule_name in added
             )
-        )
 
-    async_add_entities(entities, update_before_add=True)
+    _async_sync_rules()
+    entry.async_on_unload(coordinator.async_add_listener(_async_sync_rules))
+
+
+def rule_unique_id(serial: str, rule_name: str, vsys: str | None = None) -> str:
+    name = rule_name if vsys is None else f"{vsys}_{rule_name}"
+    return f"pan_{serial}_{name}".lower().replace(" ", "_").replace("/", "_")
+
+
+def _timestamp(epoch: int) -> str | None:
+    """Firewall epoch seconds as ISO 8601; 0 means never."""
+    return dt_util.utc_from_timestamp(epoch).isoformat() if epoch else None
 
 
 class PanFirewallRuleSwitch(CoordinatorEntity, SwitchEntity):
-    def __init__(self, coordinator, rule_name: str, fw, serial: str, hostname: str, model: str, version: str):
-        super().__init__(coordinator)
+    def __init__(self, coordinator, commit_scheduler, rule_name: str, fw, serial: str, hostname: str, model: str, version: str,
+                 vsys: str | None = None):
+        self._vsys = vsys or coordinator.vsys
+        self._rules_key = coordinator.vsys_key("security_rules", self._vsys)
+        self._hits_key = coordinator.vsys_key("rule_hits", self._vsys)
+        super().__init__(
+            coordinator,
+            context=frozenset({(self._rules_key, rule_name), (self._hits_key, rule_name)}),
+        )
+        self._commit_scheduler = commit_scheduler
         self._rule_name = rule_name
         self._fw = fw
         self._serial = serial
@@ -47,8 +114,12 @@ class PanFirewallRuleSwitch(CoordinatorEntity, SwitchEntity):
         self._model = model
         self._version = version
 
-        self._attr_name = f"PAN Rule {rule_name}"
-        self._attr_unique_id = f"pan_{serial}_{rule_name}".lower().replace(" ", "_").replace("/", "_")
+        if self._vsys == coordinator.vsys:
+            self._attr_name = f"PAN Rule {rule_name}"
+            self._attr_unique_id = rule_unique_id(serial, rule_name)
+        else:
+            self._attr_name = f"PAN Rule {rule_name} ({self._vsys})"
+            self._attr_unique_id = rule_unique_id(serial, rule_name, self._vsys)
         self._attr_icon = "mdi:shield-lock"
         self._attr_device_class = "switch"
         self._attr_has_entity_name = True
@@ -68,8 +139,22 @@ class PanFirewallRuleSwitch(CoordinatorEntity, SwitchEntity):
 
     @property
     def is_on(self) -> bool:
-        rule = self.coordinator.data.get("security_rules", {}).get(self._rule_name)
-        return rule is not None and not getattr(rule, "disabled", False)
+        rule = self.coordinator.data.get(self._rules_key, {}).get(self._rule_name)
+        return rule is not None and not rule.disabled
+
+    @property
+    def extra_state_attributes(self):
+        hits = self.coordinator.data.get(self._hits_key, {}).get(self._rule_name)
+        if hits is None:
+            return None
+        return {
+            "hit_count": hits.hits,
+            "last_hit": _timestamp(hits.last_hit),
+            "first_hit": _timestamp(hits.first_hit),
+            "days_since_last_hit": (
+                int((time.time() - hits.last_hit) // 86400) if hits.last_hit else None
+            ),
+        }
 
     async def async_turn_on(self, **kwargs):
         await self._set_disabled(False)
@@ -78,16 +163,13 @@ class PanFirewallRuleSwitch(CoordinatorEntity, SwitchEntity):
         await self._set_disabled(True)
 
     async def _set_disabled(self, disabled: bool):
-        """Enable/disable the rule and commit the configuration."""
-        def set_and_commit():
-            rule = self.coordinator.data.get("security_rules", {}).get(self._rule_name)
-            if rule is None:
-                raise ValueError(f"Rule '{self._rule_name}' not found")
-
-            rule.disabled = disabled
-            rule.apply()               # ← This is the correct method to update the rule object
-            self._fw.commit(sync=True) # Commit immediately
-            return True
-
-        await self.hass.async_add_executor_job(set_and_commit)
-        await self.coordinator.async_request_refresh()
+        """Enable/disable the rule and queue a (batched) commit."""
+        if self._rule_name not in self.coordinator.data.get(self._rules_key, {}):
+            raise ValueError(f"Rule '{self._rule_name}' not found")
+
+        await self._fw.async_set_config(
+            rule_xpath(self._vsys, "security", self._rule_name),
+            f"<disabled>{'yes' if disabled else 'no'}</disabled>",
+        )
+        self.coordinator.async_set_rules_disabled("security_rules", [self._rule_name], disabled, self._vsys)
+        self._commit_scheduler.async_request_commit()